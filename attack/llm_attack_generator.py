@@ -1,45 +1,119 @@
+import asyncio
 import json
-import random
+import os
+import secrets
 import time
-from typing import Dict, List, Any, Optional
+from contextlib import AsyncExitStack
+from typing import Dict, List, Any, AsyncIterator, Optional, Tuple
+from dataclasses import dataclass
 from datetime import datetime
 import openai
 import anthropic
+from utils import fast_json
+from utils.async_runner import aclosing, get_http_client, iterate_in_loop, run_in_loop, run_sync
 from utils.config_manager import ConfigManager
+from utils.llm_retry import llm_retry
 from utils.logger import logger
+from utils.rate_limiter import ProviderLimiter, estimate_tokens
+from utils.response_cache import ResponseCache
+
+# Незмінна частина промпту: однаковий префікс для всіх запитів,
+# щоб провайдери могли кешувати його (prompt caching)
+ATTACK_SYSTEM_PROMPT = """
+Ти - експерт з кібербезпеки та етичного хакінгу, який аналізує потенційні вразливості.
+Твоє завдання - створювати детальні сценарії атак для заданої цілі.
+
+Вимоги:
+1. Атака повинна бути реалістичною та адаптивною
+2. Включити етапи: розвідка, підготовка, виконання, закриття слідів
+3. Описати технічні деталі та соціальні аспекти
+4. Вказати потенційні контрзаходи
+
+Формат відповіді: JSON з полями:
+- title: назва атаки
+- description: опис
+- stages: етапи атаки
+- technical_details: технічні деталі
+- social_aspects: соціальні аспекти
+- countermeasures: контрзаходи
+- risk_level: рівень ризику (1-10)
+"""
+
+@dataclass(frozen=True)
+class AttackTemplate:
+    """Шаблон атаки"""
+    __slots__ = ("name", "description", "complexity", "success_rate")
+    
+    name: str
+    description: str
+    complexity: str
+    success_rate: float
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Представлення шаблону у вигляді словника (для API та JSON)"""
+        return {
+            "description": self.description,
+            "complexity": self.complexity,
+            "success_rate": self.success_rate
+        }
+
+# Шаблони атак (незмінні, створюються один раз під час імпорту)
+ATTACK_TEMPLATES: Tuple[AttackTemplate, ...] = (
+    AttackTemplate(
+        name="phishing",
+        description="Фішинг атака з використанням соціальної інженерії",
+        complexity="medium",
+        success_rate=0.7
+    ),
+    AttackTemplate(
+        name="social_engineering",
+        description="Соціальна інженерія через різні канали комунікації",
+        complexity="high",
+        success_rate=0.8
+    ),
+    AttackTemplate(
+        name="credential_harvesting",
+        description="Збір облікових даних через фальшиві форми",
+        complexity="medium",
+        success_rate=0.6
+    ),
+    AttackTemplate(
+        name="malware_distribution",
+        description="Розповсюдження шкідливого ПЗ через LLM-генерований контент",
+        complexity="high",
+        success_rate=0.5
+    ),
+)
+
+_TEMPLATES_BY_NAME: Dict[str, AttackTemplate] = {t.name: t for t in ATTACK_TEMPLATES}
 
 class LLMAttackGenerator:
     """Генератор атак з використанням LLM моделей"""
     
-    def __init__(self):
+    def __init__(self, cache_file: Optional[str] = None):
         self.config = ConfigManager()
         self.openai_client = None
         self.anthropic_client = None
         self._setup_clients()
         
-        # Шаблони атак
-        self.attack_templates = {
-            "phishing": {
-                "description": "Фішинг атака з використанням соціальної інженерії",
-                "complexity": "medium",
-                "success_rate": 0.7
-            },
-            "social_engineering": {
-                "description": "Соціальна інженерія через різні канали комунікації",
-                "complexity": "high",
-                "success_rate": 0.8
-            },
-            "credential_harvesting": {
-                "description": "Збір облікових даних через фальшиві форми",
-                "complexity": "medium",
-                "success_rate": 0.6
-            },
-            "malware_distribution": {
-                "description": "Розповсюдження шкідливого ПЗ через LLM-генерований контент",
-                "complexity": "high",
-                "success_rate": 0.5
-            }
+        # Дисковий кеш відповідей LLM
+        self.response_cache = None
+        self._setup_cache(cache_file or self.config.get("llm_cache.file_path"))
+        
+        # Обмеження паралельності та RPM/TPM для кожного провайдера
+        # (примітиви asyncio створюються у спільному event loop при першому запиті)
+        self._limiters = {
+            provider: ProviderLimiter.for_provider(
+                provider, self.config.get(f"llm_providers.{provider}", {}) or {}
+            )
+            for provider in ("openai", "anthropic")
         }
+        
+        # Шаблони атак (спільний реєстр модуля)
+        self.attack_templates = _TEMPLATES_BY_NAME
+        
+        # Шаблони незмінні - статистика обчислюється один раз
+        self._attack_statistics = self._compute_attack_statistics()
     
     def _setup_clients(self):
         """Налаштування клієнтів LLM"""
@@ -48,37 +122,119 @@ class LLMAttackGenerator:
             openai_config = self.config.get_llm_config("openai")
             if openai_config.get("api_key"):
                 openai.api_key = openai_config["api_key"]
-                self.openai_client = openai.OpenAI()
+                # Повтори виконує лише llm_retry (вбудовані повтори SDK вимкнено)
+                self.openai_client = openai.AsyncOpenAI(
+                    http_client=get_http_client(),
+                    max_retries=0
+                )
                 logger.info("OpenAI клієнт налаштовано")
             
             # Anthropic
             anthropic_config = self.config.get_llm_config("anthropic")
             if anthropic_config.get("api_key"):
-                self.anthropic_client = anthropic.Anthropic(
-                    api_key=anthropic_config["api_key"]
+                self.anthropic_client = anthropic.AsyncAnthropic(
+                    api_key=anthropic_config["api_key"],
+                    http_client=get_http_client(),
+                    max_retries=0
                 )
                 logger.info("Anthropic клієнт налаштовано")
                 
         except Exception as e:
             logger.error(f"Помилка налаштування LLM клієнтів: {e}")
     
+    def _setup_cache(self, cache_file: Optional[str]):
+        """Налаштування дискового кешу відповідей"""
+        if not cache_file:
+            return
+        
+        try:
+            self.response_cache = ResponseCache(cache_file)
+            logger.info(f"Кеш відповідей LLM: {cache_file}")
+        except Exception as e:
+            logger.error(f"Помилка налаштування кешу відповідей: {e}")
+    
     def generate_attack_scenario(self, attack_type: str, target_info: Dict[str, Any], 
-                               provider: str = "openai") -> Dict[str, Any]:
-        """Генерація сценарію атаки за допомогою LLM"""
+                               provider: str = "openai", use_cache: bool = True) -> Dict[str, Any]:
+        """Генерація сценарію атаки за допомогою LLM (синхронна обгортка)"""
+        return run_sync(
+            self._agenerate_attack_scenario(attack_type, target_info, provider, use_cache)
+        )
+    
+    async def agenerate_attack_scenario(self, attack_type: str, target_info: Dict[str, Any], 
+                                        provider: str = "openai",
+                                        use_cache: bool = True) -> Dict[str, Any]:
+        """Асинхронна генерація сценарію атаки за допомогою LLM"""
+        return await run_in_loop(
+            self._agenerate_attack_scenario(attack_type, target_info, provider, use_cache)
+        )
+    
+    async def agenerate_many(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Паралельна генерація сценаріїв атак (кожен запит - kwargs для agenerate_attack_scenario)"""
+        async def _gather():
+            return await asyncio.gather(
+                *[self._agenerate_attack_scenario(**request) for request in requests]
+            )
+        
+        return await run_in_loop(_gather())
+    
+    async def stream_attack_scenario(self, attack_type: str, target_info: Dict[str, Any], 
+                                     provider: str = "openai") -> AsyncIterator[str]:
+        """Потокова генерація сценарію атаки: текстові фрагменти по мірі надходження"""
+        # Потік закривається одразу після виходу з циклу (break, відключення клієнта):
+        # слот обмежувача провайдера не утримується до збирання сміття
+        chunks = iterate_in_loop(self._astream_attack_scenario(attack_type, target_info, provider))
+        async with aclosing(chunks):
+            async for chunk in chunks:
+                yield chunk
+    
+    async def _astream_attack_scenario(self, attack_type: str, target_info: Dict[str, Any], 
+                                       provider: str) -> AsyncIterator[str]:
+        """Потокова генерація у спільному event loop"""
+        template = self._get_template(attack_type)
+        prompt = self._create_attack_prompt(attack_type, target_info, template)
+        
+        if provider == "openai" and self.openai_client:
+            stream = self._stream_openai(prompt)
+        elif provider == "anthropic" and self.anthropic_client:
+            stream = self._stream_anthropic(prompt)
+        else:
+            fallback = self._generate_fallback(attack_type, target_info, template)
+            yield json.dumps(fallback, ensure_ascii=False)
+            return
+        
+        # Фрагменти збираються у список і з'єднуються один раз наприкінці
+        chunks = []
+        async with aclosing(stream):
+            async for chunk in stream:
+                chunks.append(chunk)
+                yield chunk
+        
+        response = self._parse_content("".join(chunks))
+        if self.response_cache and self._is_cacheable(response):
+            self.response_cache.put(self._cache_key(attack_type, target_info, provider), response)
+        
+        logger.log_attack(attack_type, target_info.get("target", "unknown"), 
+                        f"Streamed via {provider}")
+    
+    async def _agenerate_attack_scenario(self, attack_type: str, target_info: Dict[str, Any], 
+                                         provider: str = "openai",
+                                         use_cache: bool = True) -> Dict[str, Any]:
+        """Генерація сценарію атаки у спільному event loop"""
         try:
-            if attack_type not in self.attack_templates:
-                raise ValueError(f"Невідомий тип атаки: {attack_type}")
-            
-            template = self.attack_templates[attack_type]
+            template = self._get_template(attack_type)
             
             # Формування промпту для LLM
             prompt = self._create_attack_prompt(attack_type, target_info, template)
             
-            # Генерація через LLM
+            # Генерація через LLM (з перевіркою кешу)
             if provider == "openai" and self.openai_client:
-                response = self._generate_with_openai(prompt, attack_type)
+                response = await self._generate_cached(
+                    self._generate_with_openai, prompt, attack_type, target_info, provider, use_cache
+                )
             elif provider == "anthropic" and self.anthropic_client:
-                response = self._generate_with_anthropic(prompt, attack_type)
+                response = await self._generate_cached(
+                    self._generate_with_anthropic, prompt, attack_type, target_info, provider, use_cache
+                )
             else:
                 response = self._generate_fallback(attack_type, target_info, template)
             
@@ -86,16 +242,7 @@ class LLMAttackGenerator:
             logger.log_attack(attack_type, target_info.get("target", "unknown"), 
                             f"Generated via {provider}")
             
-            return {
-                "attack_id": f"attack_{int(time.time())}_{random.randint(1000, 9999)}",
-                "type": attack_type,
-                "target": target_info,
-                "scenario": response,
-                "template": template,
-                "provider": provider,
-                "timestamp": datetime.now().isoformat(),
-                "status": "generated"
-            }
+            return self._build_scenario(attack_type, target_info, template, response, provider)
             
         except Exception as e:
             logger.error(f"Помилка генерації атаки: {e}")
@@ -104,91 +251,212 @@ class LLMAttackGenerator:
                 "status": "failed"
             }
     
+    @staticmethod
+    def _get_template(attack_type: str) -> AttackTemplate:
+        """Пошук шаблону атаки за типом (один пошук у словнику)"""
+        template = _TEMPLATES_BY_NAME.get(attack_type)
+        if template is None:
+            raise ValueError(f"Невідомий тип атаки: {attack_type}")
+        return template
+    
+    def _build_scenario(self, attack_type: str, target_info: Dict[str, Any],
+                        template: AttackTemplate, response: Dict[str, Any],
+                        provider: str, attack_id: Optional[str] = None) -> Dict[str, Any]:
+        """Формування результату генерації сценарію атаки"""
+        # Один виклик годинника на сценарій: і для ID, і для мітки часу
+        now_ns = time.time_ns()
+        
+        return {
+            "attack_id": attack_id or self._new_attack_id(now_ns),
+            "type": attack_type,
+            "target": target_info,
+            "scenario": response,
+            "template": template.to_dict(),
+            "provider": provider,
+            "timestamp": datetime.fromtimestamp(now_ns / 1e9).isoformat(),
+            "status": "generated"
+        }
+    
+    @staticmethod
+    def _new_attack_id(now_ns: Optional[int] = None) -> str:
+        """Генерація ідентифікатора атаки"""
+        now_ns = now_ns or time.time_ns()
+        return f"attack_{now_ns // 1_000_000_000}_{secrets.token_hex(4)}"
+    
+    async def _generate_cached(self, generate, prompt: str, attack_type: str,
+                               target_info: Dict[str, Any], provider: str,
+                               use_cache: bool) -> Dict[str, Any]:
+        """Генерація через LLM з використанням дискового кешу"""
+        if not use_cache or not self.response_cache:
+            return await generate(prompt, attack_type)
+        
+        key = self._cache_key(attack_type, target_info, provider)
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            logger.debug(f"Кеш LLM: знайдено відповідь для {attack_type} ({provider})")
+            return cached
+        
+        response = await generate(prompt, attack_type)
+        if self._is_cacheable(response):
+            self.response_cache.put(key, response)
+        
+        return response
+    
+    @staticmethod
+    def _is_cacheable(response: Dict[str, Any]) -> bool:
+        """Кешуються лише успішні відповіді з розпізнаним JSON"""
+        return "error" not in response and response.get("parsed", True)
+    
+    def _cache_key(self, attack_type: str, target_info: Dict[str, Any], provider: str) -> str:
+        """Ключ кешу для запиту генерації"""
+        return ResponseCache.make_key({
+            "attack_type": attack_type,
+            "target_info": target_info,
+            "provider": provider,
+            "model": self.config.get(f"llm_providers.{provider}.model"),
+            "temperature": self.config.get(f"llm_providers.{provider}.temperature")
+        })
+    
     def _create_attack_prompt(self, attack_type: str, target_info: Dict[str, Any], 
-                             template: Dict[str, Any]) -> str:
-        """Створення промпту для LLM"""
+                             template: AttackTemplate) -> str:
+        """Створення змінної частини промпту (інструкції - в ATTACK_SYSTEM_PROMPT)"""
         target_description = target_info.get("description", "корпоративна мережа")
         target_industry = target_info.get("industry", "технології")
         
         prompt = f"""
-        Ти - експерт з кібербезпеки, який аналізує потенційні вразливості. 
         Створи детальний сценарій {attack_type} атаки для {target_description} 
         в галузі {target_industry}.
-        
-        Вимоги:
-        1. Атака повинна бути реалістичною та адаптивною
-        2. Включити етапи: розвідка, підготовка, виконання, закриття слідів
-        3. Описати технічні деталі та соціальні аспекти
-        4. Вказати потенційні контрзаходи
-        
-        Формат відповіді: JSON з полями:
-        - title: назва атаки
-        - description: опис
-        - stages: етапи атаки
-        - technical_details: технічні деталі
-        - social_aspects: соціальні аспекти
-        - countermeasures: контрзаходи
-        - risk_level: рівень ризику (1-10)
         """
         
         return prompt
     
-    def _generate_with_openai(self, prompt: str, attack_type: str) -> Dict[str, Any]:
+    def _openai_params(self, prompt: str) -> Dict[str, Any]:
+        """Параметри запиту до OpenAI Chat Completions"""
+        return {
+            "model": self.config.get("llm_providers.openai.model", "gpt-4"),
+            "messages": [
+                {"role": "system", "content": ATTACK_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            "max_tokens": self.config.get("llm_providers.openai.max_tokens", 2000),
+            "temperature": self.config.get("llm_providers.openai.temperature", 0.7)
+        }
+    
+    def _anthropic_params(self, prompt: str) -> Dict[str, Any]:
+        """Параметри запиту до Anthropic Messages"""
+        return {
+            "model": self.config.get("llm_providers.anthropic.model", "claude-3-sonnet-20240229"),
+            "max_tokens": self.config.get("llm_providers.anthropic.max_tokens", 2000),
+            "system": [
+                {
+                    "type": "text",
+                    "text": ATTACK_SYSTEM_PROMPT,
+                    "cache_control": {"type": "ephemeral"}
+                }
+            ],
+            "messages": [
+                {"role": "user", "content": prompt}
+            ]
+        }
+    
+    @staticmethod
+    def _parse_content(content: str) -> Dict[str, Any]:
+        """Спроба парсингу JSON відповіді LLM"""
+        # Дешева перевірка замість винятку для відповідей, що явно не є JSON об'єктом
+        if not content or not content.lstrip().startswith("{"):
+            return {"raw_response": content, "parsed": False}
+        
+        try:
+            return fast_json.loads(content)
+        except fast_json.JSONDecodeError:
+            return {"raw_response": content, "parsed": False}
+    
+    def _slot(self, provider: str, params: Dict[str, Any]):
+        """Слот обмежувача провайдера з оцінкою токенів запиту"""
+        prompt = params["messages"][-1]["content"]
+        return self._limiters[provider].slot(estimate_tokens(prompt, params["max_tokens"]))
+    
+    @llm_retry()
+    async def _request_openai(self, **params):
+        """Запит до OpenAI через обмежувач провайдера з повторними спробами"""
+        async with self._slot("openai", params):
+            return await self.openai_client.chat.completions.create(**params)
+    
+    @llm_retry()
+    async def _request_anthropic(self, **params):
+        """Запит до Anthropic через обмежувач провайдера з повторними спробами"""
+        async with self._slot("anthropic", params):
+            return await self.anthropic_client.messages.create(**params)
+    
+    @llm_retry()
+    async def _open_stream(self, provider: str, params: Dict[str, Any], stack: AsyncExitStack):
+        """Відкриття потокової відповіді з повторними спробами"""
+        # Слот займається в кожній спробі окремо: під час очікування перед повтором
+        # слот вільний. Після успішного відкриття слот переходить у stack викликача
+        # і утримується до кінця потоку
+        async with AsyncExitStack() as attempt:
+            await attempt.enter_async_context(self._slot(provider, params))
+            if provider == "openai":
+                stream = await self.openai_client.chat.completions.create(**params, stream=True)
+            else:
+                stream = await self.anthropic_client.messages.create(**params, stream=True)
+            stack.push_async_exit(attempt.pop_all())
+            return stream
+    
+    async def _stream_openai(self, prompt: str) -> AsyncIterator[str]:
+        """Потокова генерація через OpenAI"""
+        async with AsyncExitStack() as stack:
+            stream = await self._open_stream("openai", self._openai_params(prompt), stack)
+            stack.push_async_callback(stream.close)
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+    
+    async def _stream_anthropic(self, prompt: str) -> AsyncIterator[str]:
+        """Потокова генерація через Anthropic"""
+        async with AsyncExitStack() as stack:
+            stream = await self._open_stream("anthropic", self._anthropic_params(prompt), stack)
+            stack.push_async_callback(stream.close)
+            async for event in stream:
+                if event.type == "content_block_delta" and event.delta.type == "text_delta":
+                    yield event.delta.text
+    
+    async def _generate_with_openai(self, prompt: str, attack_type: str) -> Dict[str, Any]:
         """Генерація через OpenAI"""
         try:
-            response = self.openai_client.chat.completions.create(
-                model=self.config.get("llm_providers.openai.model", "gpt-4"),
-                messages=[
-                    {"role": "system", "content": "Ти експерт з кібербезпеки та етичного хакінгу."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=self.config.get("llm_providers.openai.max_tokens", 2000),
-                temperature=self.config.get("llm_providers.openai.temperature", 0.7)
-            )
+            params = self._openai_params(prompt)
+            response = await self._request_openai(**params)
             
             content = response.choices[0].message.content
-            logger.log_llm_interaction("openai", "gpt-4", f"Generated {attack_type} attack")
+            logger.log_llm_interaction("openai", params["model"], f"Generated {attack_type} attack")
             
-            # Спроба парсингу JSON
-            try:
-                return json.loads(content)
-            except json.JSONDecodeError:
-                return {"raw_response": content, "parsed": False}
+            return self._parse_content(content)
                 
         except Exception as e:
             logger.error(f"Помилка OpenAI: {e}")
             return {"error": str(e)}
     
-    def _generate_with_anthropic(self, prompt: str, attack_type: str) -> Dict[str, Any]:
+    async def _generate_with_anthropic(self, prompt: str, attack_type: str) -> Dict[str, Any]:
         """Генерація через Anthropic"""
         try:
-            response = self.anthropic_client.messages.create(
-                model=self.config.get("llm_providers.anthropic.model", "claude-3-sonnet-20240229"),
-                max_tokens=self.config.get("llm_providers.anthropic.max_tokens", 2000),
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
-            )
+            params = self._anthropic_params(prompt)
+            response = await self._request_anthropic(**params)
             
             content = response.content[0].text
-            logger.log_llm_interaction("anthropic", "claude-3", f"Generated {attack_type} attack")
+            logger.log_llm_interaction("anthropic", params["model"], f"Generated {attack_type} attack")
             
-            # Спроба парсингу JSON
-            try:
-                return json.loads(content)
-            except json.JSONDecodeError:
-                return {"raw_response": content, "parsed": False}
+            return self._parse_content(content)
                 
         except Exception as e:
             logger.error(f"Помилка Anthropic: {e}")
             return {"error": str(e)}
     
     def _generate_fallback(self, attack_type: str, target_info: Dict[str, Any], 
-                          template: Dict[str, Any]) -> Dict[str, Any]:
+                          template: AttackTemplate) -> Dict[str, Any]:
         """Резервна генерація без LLM"""
         return {
             "title": f"Стандартна {attack_type} атака",
-            "description": template["description"],
+            "description": template.description,
             "stages": [
                 "Розвідка цілі",
                 "Підготовка атаки", 
@@ -201,6 +469,176 @@ class LLMAttackGenerator:
             "risk_level": 5
         }
     
+    # Batch API (офлайн генерація корпусу сценаріїв, SLA 24 год)
+    
+    def submit_batch(self, requests: List[Dict[str, Any]], provider: str = "openai") -> str:
+        """Відправка набору запитів генерації у Batch API провайдера"""
+        try:
+            return run_sync(self._asubmit_batch(requests, provider))
+        except Exception as e:
+            logger.error(f"Помилка відправки пакету: {e}")
+            raise
+    
+    def fetch_batch(self, batch_id: str, wait: bool = True,
+                    poll_interval: float = 60) -> Dict[str, Any]:
+        """Отримання результатів пакетної генерації (з очікуванням завершення)"""
+        try:
+            return run_sync(self._afetch_batch(batch_id, wait, poll_interval))
+        except Exception as e:
+            logger.error(f"Помилка отримання пакету {batch_id}: {e}")
+            return {"batch_id": batch_id, "error": str(e), "status": "failed"}
+    
+    async def _asubmit_batch(self, requests: List[Dict[str, Any]], provider: str) -> str:
+        """Формування та відправка пакету запитів"""
+        entries = {}
+        prompts = {}
+        for request in requests:
+            attack_type = request["attack_type"]
+            target_info = request.get("target_info", {})
+            template = self._get_template(attack_type)
+            
+            custom_id = self._new_attack_id()
+            while custom_id in entries:
+                custom_id = self._new_attack_id()
+            
+            entries[custom_id] = {"attack_type": attack_type, "target_info": target_info}
+            prompts[custom_id] = self._create_attack_prompt(attack_type, target_info, template)
+        
+        if provider == "openai" and self.openai_client:
+            payload = "\n".join(
+                json.dumps({
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": self._openai_params(prompt)
+                }, ensure_ascii=False)
+                for custom_id, prompt in prompts.items()
+            )
+            batch_file = await self.openai_client.files.create(
+                file=("attack_batch.jsonl", payload.encode("utf-8")),
+                purpose="batch"
+            )
+            batch = await self.openai_client.batches.create(
+                input_file_id=batch_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
+            )
+        elif provider == "anthropic" and self.anthropic_client:
+            batch = await self.anthropic_client.messages.batches.create(
+                requests=[
+                    {"custom_id": custom_id, "params": self._anthropic_params(prompt)}
+                    for custom_id, prompt in prompts.items()
+                ]
+            )
+        else:
+            raise ValueError(f"Провайдер {provider} недоступний для Batch API")
+        
+        self._save_batch_meta(batch.id, {"provider": provider, "requests": entries})
+        logger.log_llm_interaction(provider, "batch", f"Submitted batch {batch.id} ({len(entries)} requests)")
+        
+        return batch.id
+    
+    async def _afetch_batch(self, batch_id: str, wait: bool, poll_interval: float) -> Dict[str, Any]:
+        """Очікування завершення пакету та формування результатів"""
+        meta = self._load_batch_meta(batch_id)
+        provider = meta["provider"]
+        
+        while True:
+            status, finished = await self._batch_status(provider, batch_id)
+            if finished or not wait:
+                break
+            await asyncio.sleep(poll_interval)
+        
+        result = {"batch_id": batch_id, "provider": provider, "status": status, "results": []}
+        if not finished:
+            return result
+        
+        if provider == "openai":
+            outputs = await self._fetch_openai_batch_outputs(batch_id)
+        else:
+            outputs = await self._fetch_anthropic_batch_outputs(batch_id)
+        
+        for custom_id, request in meta["requests"].items():
+            if custom_id not in outputs:
+                continue
+            
+            attack_type = request["attack_type"]
+            response = outputs[custom_id]
+            if self.response_cache and self._is_cacheable(response):
+                self.response_cache.put(
+                    self._cache_key(attack_type, request["target_info"], provider), response
+                )
+            
+            result["results"].append(self._build_scenario(
+                attack_type, request["target_info"], _TEMPLATES_BY_NAME[attack_type],
+                response, provider, attack_id=custom_id
+            ))
+        
+        return result
+    
+    async def _batch_status(self, provider: str, batch_id: str):
+        """Поточний статус пакету та ознака завершення обробки"""
+        if provider == "openai":
+            batch = await self.openai_client.batches.retrieve(batch_id)
+            return batch.status, batch.status in ("completed", "failed", "expired", "cancelled")
+        
+        batch = await self.anthropic_client.messages.batches.retrieve(batch_id)
+        return batch.processing_status, batch.processing_status == "ended"
+    
+    async def _fetch_openai_batch_outputs(self, batch_id: str) -> Dict[str, Dict[str, Any]]:
+        """Завантаження результатів пакету OpenAI"""
+        batch = await self.openai_client.batches.retrieve(batch_id)
+        outputs = {}
+        
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            
+            content = await self.openai_client.files.content(file_id)
+            for line in content.text.splitlines():
+                if not line.strip():
+                    continue
+                
+                item = json.loads(line)
+                body = (item.get("response") or {}).get("body") or {}
+                if item.get("error") or not body.get("choices"):
+                    outputs[item["custom_id"]] = {"error": str(item.get("error") or body.get("error"))}
+                else:
+                    outputs[item["custom_id"]] = self._parse_content(
+                        body["choices"][0]["message"]["content"]
+                    )
+        
+        return outputs
+    
+    async def _fetch_anthropic_batch_outputs(self, batch_id: str) -> Dict[str, Dict[str, Any]]:
+        """Завантаження результатів пакету Anthropic"""
+        outputs = {}
+        
+        async for entry in await self.anthropic_client.messages.batches.results(batch_id):
+            if entry.result.type == "succeeded":
+                outputs[entry.custom_id] = self._parse_content(entry.result.message.content[0].text)
+            else:
+                outputs[entry.custom_id] = {"error": entry.result.type}
+        
+        return outputs
+    
+    def _batch_meta_path(self, batch_id: str) -> str:
+        """Шлях до файлу з метаданими пакету"""
+        batch_dir = self.config.get("llm_batch.dir", "data/batches")
+        return os.path.join(batch_dir, f"{batch_id}.json")
+    
+    def _save_batch_meta(self, batch_id: str, meta: Dict[str, Any]):
+        """Збереження метаданих пакету (переживає перезапуск процесу)"""
+        path = self._batch_meta_path(batch_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(meta, file, ensure_ascii=False)
+    
+    def _load_batch_meta(self, batch_id: str) -> Dict[str, Any]:
+        """Завантаження метаданих пакету"""
+        with open(self._batch_meta_path(batch_id), 'r', encoding='utf-8') as file:
+            return json.load(file)
+    
     def analyze_attack_effectiveness(self, attack_scenario: Dict[str, Any], 
                                    target_defenses: List[str]) -> Dict[str, Any]:
         """Аналіз ефективності атаки проти захисту"""
@@ -245,12 +683,20 @@ class LLMAttackGenerator:
     
     def get_attack_statistics(self) -> Dict[str, Any]:
         """Отримання статистики атак"""
+        stats = self._attack_statistics
+        return {
+            **stats,
+            "complexity_distribution": dict(stats["complexity_distribution"])
+        }
+    
+    def _compute_attack_statistics(self) -> Dict[str, Any]:
+        """Обчислення статистики шаблонів атак"""
         return {
-            "total_templates": len(self.attack_templates),
+            "total_templates": len(ATTACK_TEMPLATES),
             "complexity_distribution": {
-                "low": len([t for t in self.attack_templates.values() if t["complexity"] == "low"]),
-                "medium": len([t for t in self.attack_templates.values() if t["complexity"] == "medium"]),
-                "high": len([t for t in self.attack_templates.values() if t["complexity"] == "high"])
+                "low": len([t for t in ATTACK_TEMPLATES if t.complexity == "low"]),
+                "medium": len([t for t in ATTACK_TEMPLATES if t.complexity == "medium"]),
+                "high": len([t for t in ATTACK_TEMPLATES if t.complexity == "high"])
             },
-            "average_success_rate": sum(t["success_rate"] for t in self.attack_templates.values()) / len(self.attack_templates)
+            "average_success_rate": sum(t.success_rate for t in ATTACK_TEMPLATES) / len(ATTACK_TEMPLATES)
         }
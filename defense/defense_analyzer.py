@@ -1,20 +1,51 @@
+import asyncio
 import json
+import secrets
 import time
+from itertools import takewhile
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 import openai
 import anthropic
+from utils import fast_json
+from utils.async_runner import get_http_client, run_in_loop, run_sync
 from utils.config_manager import ConfigManager
+from utils.llm_retry import llm_retry
 from utils.logger import logger
+from utils.rate_limiter import ProviderLimiter, estimate_tokens
+from utils.response_cache import ResponseCache
+
+# Небезпечні сервіси з передачею даних у відкритому вигляді
+_RISKY_SERVICES = ("telnet", "ftp", "rsh", "rlogin")
+
+# Маркер клієнта, який ще не створювався
+_UNSET = object()
+
+# Запас токенів на інструкції промпту поза деталями атаки
+_PROMPT_OVERHEAD_TOKENS = 512
 
 class DefenseAnalyzer:
     """Аналізатор захисту та генератор контрзаходів"""
     
-    def __init__(self):
+    def __init__(self, cache_file: Optional[str] = None):
         self.config = ConfigManager()
-        self.openai_client = None
-        self.anthropic_client = None
-        self._setup_clients()
+        # Клієнти LLM створюються при першому зверненні (аналіз мережі їх не потребує)
+        self._openai_client = _UNSET
+        self._anthropic_client = _UNSET
+        self.response_cache = None
+        self._setup_cache(cache_file or self.config.get("llm_cache.file_path"))
+        
+        # Параметри провайдерів читаються з конфігурації один раз
+        self._llm_settings = {
+            "openai": self._provider_settings("openai", "gpt-4", 0.7),
+            "anthropic": self._provider_settings("anthropic", "claude-3-sonnet-20240229"),
+        }
+        
+        # Обмеження паралельності та RPM/TPM для кожного провайдера
+        self._limiters = {
+            provider: ProviderLimiter.for_provider(provider, settings["raw"])
+            for provider, settings in self._llm_settings.items()
+        }
         
         # Шаблони захисту
         self.defense_layers = {
@@ -43,34 +74,110 @@ class DefenseAnalyzer:
                 "forensics": "Форензичні інструменти"
             }
         }
+        
+        # Шари захисту незмінні - назви заходів і статистика обчислюються один раз
+        self._layer_names = {
+            layer: tuple(defenses) for layer, defenses in self.defense_layers.items()
+        }
+        self._defense_statistics = self._compute_defense_statistics()
+    
+    def _provider_settings(self, provider: str, default_model: str,
+                           default_temperature: Optional[float] = None) -> Dict[str, Any]:
+        """Параметри запитів до провайдера з конфігурації"""
+        raw = self.config.get(f"llm_providers.{provider}", {}) or {}
+        settings = {
+            "raw": raw,
+            "model": raw.get("model", default_model),
+            "max_tokens": raw.get("max_tokens", 2000),
+            "temperature": raw.get("temperature", default_temperature),
+            "context_window": raw.get("context_window", 8192),
+        }
+        settings["prompt_budget"] = max(
+            0, settings["context_window"] - settings["max_tokens"] - _PROMPT_OVERHEAD_TOKENS
+        )
+        return settings
+    
+    @property
+    def openai_client(self) -> Optional[openai.AsyncOpenAI]:
+        """Клієнт OpenAI (None, якщо API ключ не налаштовано)"""
+        if self._openai_client is _UNSET:
+            self._openai_client = self._make_openai_client()
+        return self._openai_client
+    
+    @openai_client.setter
+    def openai_client(self, client: Optional[openai.AsyncOpenAI]):
+        self._openai_client = client
     
-    def _setup_clients(self):
-        """Налаштування клієнтів LLM"""
+    @property
+    def anthropic_client(self) -> Optional[anthropic.AsyncAnthropic]:
+        """Клієнт Anthropic (None, якщо API ключ не налаштовано)"""
+        if self._anthropic_client is _UNSET:
+            self._anthropic_client = self._make_anthropic_client()
+        return self._anthropic_client
+    
+    @anthropic_client.setter
+    def anthropic_client(self, client: Optional[anthropic.AsyncAnthropic]):
+        self._anthropic_client = client
+    
+    def _make_openai_client(self) -> Optional[openai.AsyncOpenAI]:
+        """Створення клієнта OpenAI"""
         try:
-            # OpenAI
             openai_config = self.config.get_llm_config("openai")
             if openai_config.get("api_key"):
                 openai.api_key = openai_config["api_key"]
-                self.openai_client = openai.OpenAI()
+                # Повтори виконує лише llm_retry (вбудовані повтори SDK вимкнено)
+                client = openai.AsyncOpenAI(http_client=get_http_client(), max_retries=0)
                 logger.info("OpenAI клієнт налаштовано для DefenseAnalyzer")
-            
-            # Anthropic
+                return client
+        except Exception as e:
+            logger.error(f"Помилка налаштування OpenAI клієнта для DefenseAnalyzer: {e}")
+        return None
+    
+    def _make_anthropic_client(self) -> Optional[anthropic.AsyncAnthropic]:
+        """Створення клієнта Anthropic"""
+        try:
             anthropic_config = self.config.get_llm_config("anthropic")
             if anthropic_config.get("api_key"):
-                self.anthropic_client = anthropic.Anthropic(
-                    api_key=anthropic_config["api_key"]
+                client = anthropic.AsyncAnthropic(
+                    api_key=anthropic_config["api_key"],
+                    http_client=get_http_client(),
+                    max_retries=0
                 )
                 logger.info("Anthropic клієнт налаштовано для DefenseAnalyzer")
-                
+                return client
+        except Exception as e:
+            logger.error(f"Помилка налаштування Anthropic клієнта для DefenseAnalyzer: {e}")
+        return None
+    
+    def _setup_cache(self, cache_file: Optional[str]):
+        """Налаштування дискового кешу відповідей"""
+        if not cache_file:
+            return
+        
+        try:
+            self.response_cache = ResponseCache(cache_file)
         except Exception as e:
-            logger.error(f"Помилка налаштування LLM клієнтів для DefenseAnalyzer: {e}")
+            logger.error(f"Помилка налаштування кешу відповідей для DefenseAnalyzer: {e}")
+    
+    async def aclose(self):
+        """Звільнення ресурсів аналізатора (спільний пул HTTP з'єднань не закривається)"""
+        # Клієнти використовують спільний HTTP клієнт, тому не закриваються, а лише
+        # відкидаються - за потреби вони будуть створені знову
+        self._openai_client = _UNSET
+        self._anthropic_client = _UNSET
+        
+        if self.response_cache:
+            self.response_cache.close()
+            self.response_cache = None
     
     def analyze_network_security(self, network_info: Dict[str, Any]) -> Dict[str, Any]:
         """Аналіз безпеки мережі"""
         try:
+            # Один виклик годинника на аналіз: і для ID, і для мітки часу
+            now_ns = time.time_ns()
             analysis = {
-                "network_id": f"network_{int(time.time())}",
-                "timestamp": datetime.now().isoformat(),
+                "network_id": self._new_id("network", now_ns),
+                "timestamp": datetime.fromtimestamp(now_ns / 1e9).isoformat(),
                 "vulnerabilities": [],
                 "recommendations": [],
                 "risk_score": 0,
@@ -88,10 +195,9 @@ class DefenseAnalyzer:
                 })
             
             # Аналіз сервісів
-            services = network_info.get("services", {})
-            risky_services = ["telnet", "ftp", "rsh", "rlogin"]
-            for service in risky_services:
-                if service in str(services).lower():
+            service_names = self._service_names(network_info.get("services", {}))
+            for service in _RISKY_SERVICES:
+                if service in service_names:
                     analysis["vulnerabilities"].append({
                         "type": "risky_service",
                         "description": f"Ризикований сервіс: {service}",
@@ -118,6 +224,22 @@ class DefenseAnalyzer:
             logger.error(f"Помилка аналізу безпеки мережі: {e}")
             return {"error": str(e)}
     
+    @staticmethod
+    def _new_id(prefix: str, now_ns: int) -> str:
+        """Генерація ідентифікатора (секунди + випадковий суфікс, без колізій в межах секунди)"""
+        return f"{prefix}_{now_ns // 1_000_000_000}_{secrets.token_hex(4)}"
+    
+    @staticmethod
+    def _service_names(services: Any) -> set:
+        """Назви сервісів у нижньому регістрі (ключі та рядкові значення словника або елементи списку)"""
+        if isinstance(services, dict):
+            items = list(services.keys()) + [v for v in services.values() if isinstance(v, str)]
+        elif isinstance(services, (list, tuple, set)):
+            items = services
+        else:
+            items = [services]
+        return {str(item).lower() for item in items}
+    
     def _generate_network_recommendations(self, analysis: Dict[str, Any]) -> List[str]:
         """Генерація рекомендацій для мережі"""
         recommendations = []
@@ -140,62 +262,221 @@ class DefenseAnalyzer:
         """Аналіз покриття захисту"""
         coverage = {}
         
-        for layer, defenses in self.defense_layers.items():
+        for layer, names in self._layer_names.items():
             layer_coverage = 0
             implemented = network_info.get(f"implemented_{layer}", [])
             
             if implemented:
-                layer_coverage = len(implemented) / len(defenses)
+                layer_coverage = len(implemented) / len(names)
             
+            implemented_set = frozenset(implemented)
             coverage[layer] = {
                 "coverage_percentage": round(layer_coverage * 100, 1),
                 "implemented": implemented,
-                "missing": [d for d in defenses.keys() if d not in implemented]
+                "missing": [d for d in names if d not in implemented_set]
             }
         
         return coverage
     
     def generate_defense_strategy(self, attack_scenario: Dict[str, Any], 
                                 current_defenses: List[str],
-                                provider: str = "openai") -> Dict[str, Any]:
-        """Генерація стратегії захисту за допомогою LLM"""
+                                provider: str = "openai",
+                                use_cache: bool = True) -> Dict[str, Any]:
+        """Генерація стратегії захисту за допомогою LLM (синхронна обгортка)"""
+        return run_sync(
+            self._agenerate_defense_strategy(attack_scenario, current_defenses, provider, use_cache)
+        )
+    
+    async def agenerate_defense_strategy(self, attack_scenario: Dict[str, Any], 
+                                         current_defenses: List[str],
+                                         provider: str = "openai",
+                                         use_cache: bool = True) -> Dict[str, Any]:
+        """Асинхронна генерація стратегії захисту за допомогою LLM"""
+        return await run_in_loop(
+            self._agenerate_defense_strategy(attack_scenario, current_defenses, provider, use_cache)
+        )
+    
+    async def agenerate_defense_strategy_batch(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Паралельна генерація стратегій (кожне завдання - kwargs для agenerate_defense_strategy)"""
+        async def _gather():
+            return await asyncio.gather(
+                *[self._agenerate_defense_strategy(**job) for job in jobs]
+            )
+        
+        return await run_in_loop(_gather())
+    
+    async def _agenerate_defense_strategy(self, attack_scenario: Dict[str, Any], 
+                                          current_defenses: List[str],
+                                          provider: str = "openai",
+                                          use_cache: bool = True) -> Dict[str, Any]:
+        """Генерація стратегії захисту у спільному event loop"""
         try:
             # Формування промпту для LLM
-            prompt = self._create_defense_prompt(attack_scenario, current_defenses)
+            prompt = self._create_defense_prompt(attack_scenario, current_defenses, provider)
             
             # Генерація через LLM
             if provider == "openai" and self.openai_client:
-                response = self._generate_with_openai(prompt, "defense_strategy")
+                response = await self._generate_cached(
+                    self._generate_with_openai, prompt, provider, use_cache
+                )
             elif provider == "anthropic" and self.anthropic_client:
-                response = self._generate_with_anthropic(prompt, "defense_strategy")
+                response = await self._generate_cached(
+                    self._generate_with_anthropic, prompt, provider, use_cache
+                )
             else:
                 response = self._generate_fallback_defense(attack_scenario, current_defenses)
             
-            strategy = {
-                "strategy_id": f"defense_{int(time.time())}",
-                "attack_type": attack_scenario.get("type"),
-                "attack_id": attack_scenario.get("attack_id"),
-                "current_defenses": current_defenses,
-                "recommended_defenses": response,
-                "provider": provider,
-                "timestamp": datetime.now().isoformat(),
-                "priority": self._calculate_defense_priority(attack_scenario)
-            }
-            
-            logger.log_defense("strategy_generation", attack_scenario.get("type", "unknown"), 
-                             f"Generated via {provider}")
+            # Нерозібрана відповідь LLM - резервна стратегія замість сирого тексту
+            if isinstance(response, dict) and response.get("parsed") is False:
+                logger.warning("Відповідь LLM не розібрана - використано резервну стратегію захисту")
+                response = self._generate_fallback_defense(attack_scenario, current_defenses)
             
-            return strategy
+            return self._build_strategy(attack_scenario, current_defenses, response, provider)
             
         except Exception as e:
             logger.error(f"Помилка генерації стратегії захисту: {e}")
             return {"error": str(e)}
     
+    def generate_defense_strategy_multi(self, scenarios: List[Dict[str, Any]],
+                                        current_defenses: List[str],
+                                        provider: str = "openai",
+                                        use_cache: bool = True) -> List[Dict[str, Any]]:
+        """Генерація стратегій для кількох сценаріїв одним запитом (синхронна обгортка)"""
+        return run_sync(
+            self._agenerate_defense_strategy_multi(scenarios, current_defenses, provider, use_cache)
+        )
+    
+    async def agenerate_defense_strategy_multi(self, scenarios: List[Dict[str, Any]],
+                                               current_defenses: List[str],
+                                               provider: str = "openai",
+                                               use_cache: bool = True) -> List[Dict[str, Any]]:
+        """Асинхронна генерація стратегій для кількох сценаріїв одним запитом"""
+        return await run_in_loop(
+            self._agenerate_defense_strategy_multi(scenarios, current_defenses, provider, use_cache)
+        )
+    
+    async def _agenerate_defense_strategy_multi(self, scenarios: List[Dict[str, Any]],
+                                                current_defenses: List[str],
+                                                provider: str = "openai",
+                                                use_cache: bool = True) -> List[Dict[str, Any]]:
+        """Пакування K сценаріїв в один промпт з відповіддю у вигляді JSON масиву"""
+        if provider == "openai" and self.openai_client:
+            generate = self._generate_with_openai
+        elif provider == "anthropic" and self.anthropic_client:
+            generate = self._generate_with_anthropic
+        else:
+            generate = None
+        
+        if generate and len(scenarios) > 1:
+            try:
+                prompt = self._create_defense_multi_prompt(scenarios, current_defenses, provider)
+                response = await self._generate_cached(
+                    generate, prompt, provider, use_cache, "defense_strategy_multi",
+                    expected_items=len(scenarios)
+                )
+                
+                if isinstance(response, list) and len(response) == len(scenarios):
+                    return [
+                        self._build_strategy(scenario, current_defenses, item, provider)
+                        for scenario, item in zip(scenarios, response)
+                    ]
+                
+                # Обрізана або закоротка відповідь - використовуємо повні елементи,
+                # решту генеруємо окремо
+                recovered = self._recovered_items(response, len(scenarios))
+                if recovered:
+                    logger.warning(f"Відновлено {len(recovered)} з {len(scenarios)} стратегій з обрізаної відповіді LLM")
+                    rest = await asyncio.gather(*[
+                        self._agenerate_defense_strategy(scenario, current_defenses, provider, use_cache)
+                        for scenario in scenarios[len(recovered):]
+                    ])
+                    return [
+                        self._build_strategy(scenario, current_defenses, item, provider)
+                        for scenario, item in zip(scenarios, recovered)
+                    ] + list(rest)
+                
+                logger.warning("Пакетна відповідь LLM не розібрана - генерація по одному сценарію")
+                
+            except Exception as e:
+                logger.error(f"Помилка пакетної генерації стратегій захисту: {e}")
+        
+        return list(await asyncio.gather(*[
+            self._agenerate_defense_strategy(scenario, current_defenses, provider, use_cache)
+            for scenario in scenarios
+        ]))
+    
+    def _build_strategy(self, attack_scenario: Dict[str, Any], current_defenses: List[str],
+                        response: Dict[str, Any], provider: str) -> Dict[str, Any]:
+        """Формування стратегії захисту з відповіді LLM"""
+        now_ns = time.time_ns()
+        strategy = {
+            "strategy_id": self._new_id("defense", now_ns),
+            "attack_type": attack_scenario.get("type"),
+            "attack_id": attack_scenario.get("attack_id"),
+            "current_defenses": current_defenses,
+            "recommended_defenses": response,
+            "provider": provider,
+            "timestamp": datetime.fromtimestamp(now_ns / 1e9).isoformat(),
+            "priority": self._calculate_defense_priority(attack_scenario)
+        }
+        
+        logger.log_defense("strategy_generation", attack_scenario.get("type", "unknown"), 
+                         f"Generated via {provider}")
+        
+        return strategy
+    
+    async def _generate_cached(self, generate, prompt: str, provider: str,
+                               use_cache: bool,
+                               action_type: str = "defense_strategy",
+                               expected_items: Optional[int] = None) -> Dict[str, Any]:
+        """Генерація через LLM з використанням дискового кешу"""
+        if not use_cache or not self.response_cache:
+            return await generate(prompt, action_type)
+        
+        key = ResponseCache.make_key({
+            "action": action_type,
+            "provider": provider,
+            "model": self._llm_settings[provider]["model"],
+            "temperature": self._llm_settings[provider]["temperature"],
+            "prompt": prompt
+        })
+        cached = self.response_cache.get(key)
+        if cached is not None and self._is_cacheable(cached, expected_items):
+            logger.debug(f"Кеш LLM: знайдено стратегію захисту ({provider})")
+            return cached
+        
+        response = await generate(prompt, action_type)
+        if self._is_cacheable(response, expected_items):
+            self.response_cache.put(key, response)
+        
+        return response
+    
+    @staticmethod
+    def _is_cacheable(response: Any, expected_items: Optional[int] = None) -> bool:
+        """Кешуються лише успішні відповіді з розпізнаним JSON"""
+        # Масив стратегій придатний лише якщо відповідає кожному сценарію запиту
+        if isinstance(response, list):
+            return expected_items is not None and len(response) == expected_items
+        return "error" not in response and response.get("parsed", True)
+    
+    @staticmethod
+    def _recovered_items(response: Any, expected_items: int) -> List[Dict[str, Any]]:
+        """Повні стратегії з початку неповної пакетної відповіді"""
+        if isinstance(response, dict):
+            return response.get("partial", [])[:expected_items]
+        # Масив довший за список сценаріїв не зіставляється з ними однозначно
+        if not isinstance(response, list) or len(response) > expected_items:
+            return []
+        return list(takewhile(lambda item: isinstance(item, dict), response))
+    
     def _create_defense_prompt(self, attack_scenario: Dict[str, Any], 
-                              current_defenses: List[str]) -> str:
+                              current_defenses: List[str],
+                              provider: str = "openai") -> str:
         """Створення промпту для генерації захисту"""
         attack_type = attack_scenario.get("type", "unknown")
-        attack_details = attack_scenario.get("scenario", {})
+        attack_details = self._fit_to_budget(
+            attack_scenario.get("scenario", {}), self._prompt_budget(provider)
+        )
         
         prompt = f"""
         Ти - експерт з кібербезпеки, який створює стратегії захисту.
@@ -203,7 +484,7 @@ class DefenseAnalyzer:
         
         Інформація про атаку:
         - Тип: {attack_type}
-        - Деталі: {json.dumps(attack_details, ensure_ascii=False, indent=2)}
+        - Деталі: {attack_details}
         
         Поточні заходи захисту: {current_defenses}
         
@@ -224,54 +505,160 @@ class DefenseAnalyzer:
         
         return prompt
     
-    def _generate_with_openai(self, prompt: str, action_type: str) -> Dict[str, Any]:
+    def _prompt_budget(self, provider: str) -> int:
+        """Бюджет токенів для даних атаки: вікно контексту мінус відповідь і інструкції"""
+        settings = self._llm_settings.get(provider, self._llm_settings["openai"])
+        return settings["prompt_budget"]
+    
+    @staticmethod
+    def _fit_to_budget(data: Any, budget_tokens: int) -> str:
+        """Компактний JSON даних, обрізаний до бюджету токенів"""
+        text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        max_chars = budget_tokens * 4
+        if len(text) > max_chars:
+            logger.warning(f"Дані атаки перевищують бюджет промпту ({len(text)} символів) - обрізано")
+            text = text[:max_chars] + "... (обрізано)"
+        return text
+    
+    def _create_defense_multi_prompt(self, scenarios: List[Dict[str, Any]],
+                                    current_defenses: List[str],
+                                    provider: str = "openai") -> str:
+        """Створення промпту для генерації захисту одразу для кількох атак"""
+        inputs = self._fit_to_budget([
+            {"type": s.get("type", "unknown"), "details": s.get("scenario", {})}
+            for s in scenarios
+        ], self._prompt_budget(provider))
+        
+        prompt = f"""
+        Ти - експерт з кібербезпеки, який створює стратегії захисту.
+        Створи детальну стратегію захисту для кожної з {len(scenarios)} атак нижче.
+        
+        Атаки: {inputs}
+        
+        Поточні заходи захисту: {current_defenses}
+        
+        Формат відповіді: JSON масив з {len(scenarios)} об'єктів у тому ж порядку, що й атаки.
+        Кожен об'єкт має поля:
+        - immediate_actions: термінові дії
+        - short_term: короткострокові заходи (1-3 місяці)
+        - long_term: довгострокові заходи (3-12 місяців)
+        - technical_controls: технічні контрзаходи
+        - organizational_controls: організаційні заходи
+        - effectiveness_estimates: оцінки ефективності
+        """
+        
+        return prompt
+    
+    @llm_retry(attempts=3)
+    async def _request_openai(self, est_tokens: int, **params):
+        """Запит до OpenAI через обмежувач провайдера з повторними спробами"""
+        async with self._limiters["openai"].slot(est_tokens):
+            return await self.openai_client.chat.completions.create(**params)
+    
+    @llm_retry(attempts=3)
+    async def _request_anthropic(self, est_tokens: int, **params):
+        """Запит до Anthropic через обмежувач провайдера з повторними спробами"""
+        async with self._limiters["anthropic"].slot(est_tokens):
+            return await self.anthropic_client.messages.create(**params)
+    
+    async def _generate_with_openai(self, prompt: str, action_type: str) -> Dict[str, Any]:
         """Генерація через OpenAI"""
         try:
-            response = self.openai_client.chat.completions.create(
-                model=self.config.get("llm_providers.openai.model", "gpt-4"),
+            settings = self._llm_settings["openai"]
+            max_tokens = settings["max_tokens"]
+            response = await self._request_openai(
+                estimate_tokens(prompt, max_tokens),
+                model=settings["model"],
                 messages=[
                     {"role": "system", "content": "Ти експерт з кібербезпеки та захисту інформації."},
                     {"role": "user", "content": prompt}
                 ],
-                max_tokens=self.config.get("llm_providers.openai.max_tokens", 2000),
-                temperature=self.config.get("llm_providers.openai.temperature", 0.7)
+                max_tokens=max_tokens,
+                temperature=settings["temperature"]
             )
             
             content = response.choices[0].message.content
-            logger.log_llm_interaction("openai", "gpt-4", f"Generated {action_type}")
-            
-            try:
-                return json.loads(content)
-            except json.JSONDecodeError:
-                return {"raw_response": content, "parsed": False}
+            logger.log_llm_interaction("openai", settings["model"], f"Generated {action_type}")
+            return self._parse_content(content)
                 
         except Exception as e:
             logger.error(f"Помилка OpenAI: {e}")
             return {"error": str(e)}
     
-    def _generate_with_anthropic(self, prompt: str, action_type: str) -> Dict[str, Any]:
+    async def _generate_with_anthropic(self, prompt: str, action_type: str) -> Dict[str, Any]:
         """Генерація через Anthropic"""
         try:
-            response = self.anthropic_client.messages.create(
-                model=self.config.get("llm_providers.anthropic.model", "claude-3-sonnet-20240229"),
-                max_tokens=self.config.get("llm_providers.anthropic.max_tokens", 2000),
+            settings = self._llm_settings["anthropic"]
+            max_tokens = settings["max_tokens"]
+            response = await self._request_anthropic(
+                estimate_tokens(prompt, max_tokens),
+                model=settings["model"],
+                max_tokens=max_tokens,
                 messages=[
                     {"role": "user", "content": prompt}
                 ]
             )
             
             content = response.content[0].text
-            logger.log_llm_interaction("anthropic", "claude-3", f"Generated {action_type}")
-            
-            try:
-                return json.loads(content)
-            except json.JSONDecodeError:
-                return {"raw_response": content, "parsed": False}
+            logger.log_llm_interaction("anthropic", settings["model"], f"Generated {action_type}")
+            return self._parse_content(content)
                 
         except Exception as e:
             logger.error(f"Помилка Anthropic: {e}")
             return {"error": str(e)}
     
+    @staticmethod
+    def _parse_content(content: str) -> Any:
+        """Парсинг JSON відповіді LLM з відновленням валідного префікса масиву"""
+        body = DefenseAnalyzer._strip_code_fence(content)
+        try:
+            return fast_json.loads(body)
+        except fast_json.JSONDecodeError:
+            pass
+        
+        response = {"raw_response": content, "parsed": False}
+        partial = DefenseAnalyzer._recover_array_prefix(body)
+        if partial:
+            response["partial"] = partial
+        return response
+    
+    @staticmethod
+    def _strip_code_fence(content: str) -> str:
+        """Видалення обгортки ```json ... ``` навколо відповіді LLM"""
+        body = content.strip()
+        if body.startswith("```"):
+            body = body.split("\n", 1)[1] if "\n" in body else ""
+            if body.rstrip().endswith("```"):
+                body = body.rstrip()[:-3]
+        return body.strip()
+    
+    @staticmethod
+    def _recover_array_prefix(content: str) -> List[Dict[str, Any]]:
+        """Повні об'єкти з початку обрізаного або зіпсованого JSON масиву"""
+        # Лише відповідь, що сама є масивом: "[" всередині обрізаного об'єкта
+        # (наприклад, {"immediate_actions": ["a", ...) - не масив стратегій
+        if not content.startswith("["):
+            return []
+        
+        decoder = json.JSONDecoder()
+        items = []
+        pos = 1
+        while True:
+            while pos < len(content) and content[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(content) or content[pos] == "]":
+                break
+            try:
+                item, pos = decoder.raw_decode(content, pos)
+            except json.JSONDecodeError:
+                break
+            # Стратегія - лише об'єкт; далі елементи не відповідатимуть сценаріям
+            if not isinstance(item, dict):
+                break
+            items.append(item)
+        
+        return items
+    
     def _generate_fallback_defense(self, attack_scenario: Dict[str, Any], 
                                  current_defenses: List[str]) -> Dict[str, Any]:
         """Резервна генерація стратегії захисту"""
@@ -323,6 +710,11 @@ class DefenseAnalyzer:
     
     def get_defense_statistics(self) -> Dict[str, Any]:
         """Отримання статистики захисту"""
+        stats = self._defense_statistics
+        return {**stats, "layer_coverage": dict(stats["layer_coverage"])}
+    
+    def _compute_defense_statistics(self) -> Dict[str, Any]:
+        """Обчислення статистики захисту"""
         total_defenses = sum(len(defenses) for defenses in self.defense_layers.values())
         
         return {
@@ -131,13 +131,15 @@ def run_health_check():
 
 def show_next_steps():
     """Показати наступні кроки"""
-    print("\n🎯 Наступні кроки:")
-    print("1. Відредагуйте файл .env та додайте свої API ключі")
-    print("2. Запустіть систему командою:")
-    print("   python web_app/run_web_app.py")
-    print("3. Відкрийте браузер та перейдіть на http://localhost:5000")
-    print("\n📚 Детальна документація: README.md")
-    print("🔧 Допомога: python web_app/run_web_app.py --help")
+    sys.stdout.write("\n".join([
+        "\n🎯 Наступні кроки:",
+        "1. Відредагуйте файл .env та додайте свої API ключі",
+        "2. Запустіть систему командою:",
+        "   python web_app/run_web_app.py",
+        "3. Відкрийте браузер та перейдіть на http://localhost:5000",
+        "\n📚 Детальна документація: README.md",
+        "🔧 Допомога: python web_app/run_web_app.py --help"
+    ]) + "\n")
 
 def main():
     """Головна функція"""
@@ -3,61 +3,122 @@
 Запуск тестів LLM Attack Analysis System
 """
 
+import importlib.util
 import os
 import sys
+import shlex
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-def run_command(command, description=""):
-    """Запуск команди з обробкою помилок"""
-    print(f"\n🚀 {description}")
-    print(f"Команда: {command}")
-    print("-" * 50)
+# Блокування виводу для кроків, що виконуються паралельно
+_print_lock = threading.Lock()
+
+# Кількість воркерів pytest-xdist (--jobs N, за замовчуванням - всі ядра)
+PYTEST_JOBS = "auto"
+
+def xdist_args():
+    """Аргументи паралельного запуску pytest (один файл - один воркер)"""
+    return f"-n {PYTEST_JOBS} --dist=loadfile"
+
+def parse_jobs(argv):
+    """Вилучення опції --jobs N (або --jobs=N) зі списку аргументів"""
+    global PYTEST_JOBS
+    
+    args = []
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg == "--jobs" and i + 1 < len(argv):
+            PYTEST_JOBS = argv[i + 1]
+            i += 2
+            continue
+        if arg.startswith("--jobs="):
+            PYTEST_JOBS = arg.split("=", 1)[1]
+        else:
+            args.append(arg)
+        i += 1
+    
+    return args
+
+def run_command(command, description="", timeout=300, stream=True):
+    """Запуск команди з обробкою помилок (stream=False - вивід друкується одним блоком в кінці)"""
+    buffered = []
+    
+    def emit(text, end="\n"):
+        if stream:
+            print(text, end=end)
+        else:
+            buffered.append(text + end)
+    
+    emit(f"\n🚀 {description}")
+    emit(f"Команда: {command}")
+    emit("-" * 50)
+    
+    timed_out = threading.Event()
+    
+    def _kill(process):
+        timed_out.set()
+        process.kill()
     
     try:
-        result = subprocess.run(
-            command,
-            shell=True,
-            capture_output=True,
+        # Без проміжного /bin/sh; stderr об'єднано зі stdout, щоб не буферизувати вивід.
+        # На Windows - не-POSIX розбір, щоб не втрачати зворотні слеші в шляхах
+        process = subprocess.Popen(
+            shlex.split(command, posix=(os.name != "nt")),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
             text=True,
-            timeout=300  # 5 хвилин таймаут
+            bufsize=1
         )
         
-        if result.returncode == 0:
-            print("✅ Команда виконана успішно")
-            if result.stdout:
-                print("Вивід:")
-                print(result.stdout)
+        timer = threading.Timer(timeout, _kill, args=(process,))  # 5 хвилин таймаут
+        timer.start()
+        try:
+            for line in process.stdout:
+                emit(line, end="")
+            returncode = process.wait()
+        finally:
+            timer.cancel()
+        
+        if timed_out.is_set():
+            emit("⏰ Команда перевищила час виконання")
+            return False
+        
+        if returncode == 0:
+            emit("✅ Команда виконана успішно")
         else:
-            print("❌ Команда завершилася з помилкою")
-            if result.stderr:
-                print("Помилки:")
-                print(result.stderr)
-            if result.stdout:
-                print("Вивід:")
-                print(result.stdout)
+            emit("❌ Команда завершилася з помилкою")
         
-        return result.returncode == 0
+        return returncode == 0
         
-    except subprocess.TimeoutExpired:
-        print("⏰ Команда перевищила час виконання")
-        return False
     except Exception as e:
-        print(f"❌ Помилка виконання команди: {e}")
+        emit(f"❌ Помилка виконання команди: {e}")
         return False
+    
+    finally:
+        if buffered:
+            with _print_lock:
+                sys.stdout.write("".join(buffered))
 
 def check_dependencies():
     """Перевірка наявності залежностей для тестування"""
     print("🔍 Перевірка залежностей для тестування...")
     
-    required_packages = ['pytest', 'pytest-cov']
-    missing_packages = []
+    # Пакет pip -> модуль для імпорту
+    required_packages = {
+        'pytest': 'pytest',
+        'pytest-cov': 'pytest_cov',
+        'pytest-xdist': 'xdist',
+        'pyyaml': 'yaml'
+    }
     
-    for package in required_packages:
-        try:
-            __import__(package.replace('-', '_'))
-        except ImportError:
-            missing_packages.append(package)
+    # find_spec лише знаходить модуль, не виконуючи його код
+    missing_packages = [
+        package for package, module in required_packages.items()
+        if importlib.util.find_spec(module) is None
+    ]
     
     if missing_packages:
         print(f"❌ Відсутні пакети: {', '.join(missing_packages)}")
@@ -71,24 +132,25 @@ def check_dependencies():
     print("✅ Всі залежності для тестування встановлено")
     return True
 
-def run_import_tests():
+def run_import_tests(stream=True):
     """Запуск тестів імпортів"""
     return run_command(
-        "python test_imports.py",
-        "Тестування імпортів модулів"
+        "python test_imports.py --full",
+        "Тестування імпортів модулів",
+        stream=stream
     )
 
 def run_unit_tests():
     """Запуск unit тестів"""
     return run_command(
-        "python -m pytest tests/ -v",
+        f"python -m pytest tests/ {xdist_args()} -v",
         "Запуск unit тестів"
     )
 
 def run_coverage_tests():
     """Запуск тестів з покриттям"""
     return run_command(
-        "python -m pytest tests/ --cov=. --cov-report=html --cov-report=term",
+        f"python -m pytest tests/ {xdist_args()} --cov=. --cov-report=html --cov-report=term",
         "Запуск тестів з покриттям коду"
     )
 
@@ -120,7 +182,7 @@ def run_integration_tests():
         "Інтеграційне тестування"
     )
 
-def generate_test_report():
+def generate_test_report(stream=True):
     """Генерація звіту про тестування"""
     print("\n📊 Генерація звіту про тестування...")
     
@@ -130,7 +192,7 @@ def generate_test_report():
     
     # Запуск тестів з генерацією звіту
     report_command = (
-        "python -m pytest tests/ "
+        f"python -m pytest tests/ {xdist_args()} "
         "--cov=. "
         "--cov-report=html:test_reports/html "
         "--cov-report=xml:test_reports/coverage.xml "
@@ -139,13 +201,14 @@ def generate_test_report():
         "-v"
     )
     
-    success = run_command(report_command, "Генерація детального звіту")
+    success = run_command(report_command, "Генерація детального звіту", stream=stream)
     
     if success:
-        print(f"\n📁 Звіти збережено в папці: {reports_dir.absolute()}")
-        print("   - HTML звіт: test_reports/html/index.html")
-        print("   - XML звіт: test_reports/coverage.xml")
-        print("   - JUnit звіт: test_reports/junit.xml")
+        with _print_lock:
+            print(f"\n📁 Звіти збережено в папці: {reports_dir.absolute()}")
+            print("   - HTML звіт: test_reports/html/index.html")
+            print("   - XML звіт: test_reports/coverage.xml")
+            print("   - JUnit звіт: test_reports/junit.xml")
     
     return success
 
@@ -155,8 +218,10 @@ def main():
     print("=" * 60)
     
     # Парсинг аргументів командного рядка
-    if len(sys.argv) > 1:
-        command = sys.argv[1]
+    args = parse_jobs(sys.argv[1:])
+    
+    if args:
+        command = args[0]
         
         if command == "imports":
             run_import_tests()
@@ -179,8 +244,8 @@ def main():
         elif command == "report":
             generate_test_report()
             return
-        elif command == "specific" and len(sys.argv) > 2:
-            test_file = sys.argv[2]
+        elif command == "specific" and len(args) > 1:
+            test_file = args[1]
             run_specific_test(test_file)
             return
         else:
@@ -196,38 +261,38 @@ def main():
         print("❌ Не вдалося налаштувати залежності для тестування")
         sys.exit(1)
     
-    # Тестування імпортів
-    import_success = run_import_tests()
-    
-    # Unit тести
-    unit_success = run_unit_tests()
-    
-    # Тести з покриттям
-    coverage_success = run_coverage_tests()
-    
-    # Генерація звіту
-    report_success = generate_test_report()
-    
-    # Підсумок
-    print("\n" + "=" * 60)
-    print("📊 Підсумок тестування:")
-    print(f"   Імпорти: {'✅' if import_success else '❌'}")
-    print(f"   Unit тести: {'✅' if unit_success else '❌'}")
-    print(f"   Покриття: {'✅' if coverage_success else '❌'}")
-    print(f"   Звіт: {'✅' if report_success else '❌'}")
+    # Тестування імпортів і pytest незалежні - виконуються паралельно,
+    # вивід кожного кроку друкується одним блоком після завершення
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        import_future = executor.submit(run_import_tests, False)
+        # Unit тести, покриття та звіти - один запуск pytest (одна фаза збору тестів)
+        report_future = executor.submit(generate_test_report, False)
+        
+        import_success = import_future.result()
+        report_success = report_future.result()
     
-    total_success = sum([import_success, unit_success, coverage_success, report_success])
-    total_tests = 4
+    total_success = sum([import_success, report_success])
+    total_tests = 2
     
-    print(f"\n🎯 Загальний результат: {total_success}/{total_tests}")
-    print(f"   Відсоток успіху: {(total_success/total_tests)*100:.1f}%")
+    # Підсумок формується повністю і виводиться одним записом
+    lines = [
+        "\n" + "=" * 60,
+        "📊 Підсумок тестування:",
+        f"   Імпорти: {'✅' if import_success else '❌'}",
+        f"   Unit тести, покриття та звіт: {'✅' if report_success else '❌'}",
+        f"\n🎯 Загальний результат: {total_success}/{total_tests}",
+        f"   Відсоток успіху: {(total_success/total_tests)*100:.1f}%"
+    ]
     
     if total_success == total_tests:
-        print("\n🎉 Всі тести пройдено успішно!")
-        print("Система готова до роботи")
+        lines += ["\n🎉 Всі тести пройдено успішно!", "Система готова до роботи"]
     else:
-        print(f"\n⚠️  {total_tests - total_success} тестів мають проблеми")
-        print("Перевірте логи та виправте помилки")
+        lines += [
+            f"\n⚠️  {total_tests - total_success} тестів мають проблеми",
+            "Перевірте логи та виправте помилки"
+        ]
+    
+    sys.stdout.write("\n".join(lines) + "\n")
     
     return total_success == total_tests
 
@@ -246,8 +311,12 @@ def show_help():
   python run_tests.py report       # Генерація звіту
   python run_tests.py specific <file>  # Конкретний тест
 
+Опції:
+  --jobs N                         # Кількість воркерів pytest-xdist (за замовчуванням: auto)
+
 Приклади:
   python run_tests.py specific tests/test_attack.py
+  python run_tests.py unit --jobs 4
   python run_tests.py coverage
   python run_tests.py report
 """
@@ -1,23 +1,281 @@
-import json
+import asyncio
 import time
 import random
+import secrets
 import threading
-from typing import Dict, List, Any, Optional, Callable
+import multiprocessing
+from array import array
+from bisect import bisect_right
+from collections import Counter, deque
+import numpy as np
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Any, Optional, Callable, Mapping, Tuple
 from datetime import datetime, timedelta
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, fields
+from utils.async_runner import get_loop
 from utils.config_manager import ConfigManager
 from utils.logger import logger
 
+# Ланцюг етапів kill chain (незмінні - спільні для всіх симуляцій)
+_BASE_STAGES = (
+    MappingProxyType({
+        "name": "reconnaissance",
+        "description": "Розвідка цілі",
+        "duration": 10,
+        "success_rate": 0.8
+    }),
+    MappingProxyType({
+        "name": "weaponization",
+        "description": "Підготовка атаки",
+        "duration": 15,
+        "success_rate": 0.7
+    }),
+    MappingProxyType({
+        "name": "delivery",
+        "description": "Доставка атаки",
+        "duration": 20,
+        "success_rate": 0.6
+    }),
+    MappingProxyType({
+        "name": "exploitation",
+        "description": "Експлуатація вразливості",
+        "duration": 25,
+        "success_rate": 0.5
+    }),
+    MappingProxyType({
+        "name": "installation",
+        "description": "Встановлення зловмисного коду",
+        "duration": 30,
+        "success_rate": 0.4
+    }),
+    MappingProxyType({
+        "name": "command_control",
+        "description": "Встановлення командного каналу",
+        "duration": 20,
+        "success_rate": 0.3
+    }),
+    MappingProxyType({
+        "name": "actions_objectives",
+        "description": "Виконання цілей атаки",
+        "duration": 40,
+        "success_rate": 0.2
+    }),
+)
+
+# Кількість етапів kill chain для типів атак (інші типи - повний ланцюг)
+_STAGE_COUNTS = {
+    "phishing": 4,
+    "malware": 6
+}
+
+# Додаткові модифікатори для специфічних заходів захисту
+_SPECIAL_DEFENSES = MappingProxyType({
+    "ids_ips": 0.1,
+    "siem": 0.1,
+    "edr": 0.15,
+    "mfa": 0.2
+})
+
+# Межі рівнів ризику (нижня межа включно) та відповідні мітки
+_RISK_THRESHOLDS = (0.2, 0.4, 0.6, 0.8)
+_RISK_LABELS = ("minimal", "low", "medium", "high", "critical")
+_TERMINAL_STATUSES = frozenset(("completed", "failed", "stopped"))
+
 @dataclass
 class SimulationEvent:
     """Подія симуляції"""
-    timestamp: datetime
+    __slots__ = (
+        "timestamp", "event_type", "description", "severity", "source", "target",
+        "stage", "success", "defense_modifier", "risk_score", "threshold"
+    )
+    
+    timestamp: int  # нс від початку симуляції (монотонний годинник)
     event_type: str
     description: str
     severity: str
     source: str
     target: str
-    metadata: Dict[str, Any]
+    # Поля етапу атаки
+    stage: str
+    success: bool
+    defense_modifier: float
+    # Поля сповіщення
+    risk_score: float
+    threshold: float
+
+_EVENT_FIELDS = tuple(field.name for field in fields(SimulationEvent))
+
+# Типи колонок сховища подій (array.array); решта полів - списки рядків
+_EVENT_ARRAY_TYPES = {
+    "timestamp": "q",
+    "success": "b",
+    "defense_modifier": "d",
+    "risk_score": "d",
+    "threshold": "d"
+}
+
+def _new_event_columns() -> Dict[str, Any]:
+    """Колонкове сховище подій симуляції (окремий масив на кожне поле)"""
+    return {
+        name: array(_EVENT_ARRAY_TYPES[name]) if name in _EVENT_ARRAY_TYPES else []
+        for name in _EVENT_FIELDS
+    }
+
+def _append_event(events: Dict[str, Any], event: SimulationEvent):
+    """Додавання події до колонкового сховища"""
+    for name in _EVENT_FIELDS:
+        events[name].append(getattr(event, name))
+
+@lru_cache(maxsize=None)
+def _get_attack_stages(attack_type: str) -> Tuple[Mapping[str, Any], ...]:
+    """Отримання етапів атаки"""
+    # Адаптація етапів для конкретного типу атаки
+    return _BASE_STAGES[:_STAGE_COUNTS.get(attack_type, len(_BASE_STAGES))]
+
+def _execute_stage(stage: Mapping[str, Any], defense_modifier: float,
+                   simulation: Dict[str, Any]) -> Dict[str, Any]:
+    """Виконання етапу атаки"""
+    stage_name = stage["name"]
+    success_rate = stage["success_rate"]
+
+    # Моделювання успішності етапу
+    is_successful = random.random() < success_rate
+
+    # Вплив захисту на успішність
+    adjusted_success = is_successful and (random.random() > defense_modifier)
+
+    if adjusted_success:
+        simulation["metrics"]["attack_success"] += 1
+        severity = "high"
+        description = f"Етап '{stage['description']}' успішно виконано"
+    else:
+        simulation["metrics"]["defense_success"] += 1
+        severity = "medium"
+        description = f"Етап '{stage['description']}' заблоковано захистом"
+
+    return {
+        "stage": stage_name,
+        "description": description,
+        "severity": severity,
+        "success": adjusted_success,
+        "defense_modifier": defense_modifier
+    }
+
+def _calculate_defense_modifier(defenses: Optional[List[str]]) -> float:
+    """Розрахунок модифікатора захисту"""
+    return _defense_modifier(tuple(defenses or ()))
+
+@lru_cache(maxsize=256)
+def _defense_modifier(defenses: Tuple[str, ...]) -> float:
+    """Модифікатор захисту для набору заходів (кешується між симуляціями)"""
+    if not defenses:
+        return 0.0
+
+    # Базовий модифікатор залежить від кількості заходів захисту
+    base_modifier = min(0.8, len(defenses) * 0.15)
+
+    # Додаткові модифікатори для специфічних заходів
+    additional_modifier = sum(_SPECIAL_DEFENSES.get(defense, 0) for defense in defenses)
+
+    return min(0.9, base_modifier + additional_modifier)
+
+def _elapsed_ns(simulation: Dict[str, Any]) -> int:
+    """Час від початку симуляції в наносекундах"""
+    return time.monotonic_ns() - simulation["start_mono_ns"]
+
+def _update_simulation_metrics(simulation: Dict[str, Any], alert_threshold: float):
+    """Оновлення метрик симуляції"""
+    metrics = simulation["metrics"]
+    
+    total_events = metrics["total_events"]
+    if total_events > 0:
+        # Розрахунок ризику на основі успішності атаки (округлення - лише у зведенні)
+        attack_ratio = metrics["attack_success"] / total_events
+        metrics["risk_score"] = attack_ratio
+        
+        # Сповіщення лише при першому перетині порогу
+        if not simulation["alert_fired"] and attack_ratio > alert_threshold:
+            simulation["alert_fired"] = True
+            _trigger_alert(simulation, attack_ratio, alert_threshold)
+
+def _should_stop_simulation(simulation: Dict[str, Any], attack_duration: float) -> bool:
+    """Перевірка умов завершення симуляції"""
+    # Завершення за часом
+    elapsed = _elapsed_ns(simulation) / 1e9
+    if elapsed > attack_duration:
+        return True
+    
+    # Завершення за успішністю атаки
+    if simulation["metrics"]["attack_success"] >= 5:
+        return True
+    
+    # Завершення за блокуванням
+    if simulation["metrics"]["defense_success"] >= 3:
+        return True
+    
+    return False
+
+def _trigger_alert(simulation: Dict[str, Any], risk_score: float, alert_threshold: float):
+    """Спрацювання сповіщення"""
+    alert_event = SimulationEvent(
+        timestamp=_elapsed_ns(simulation),
+        event_type="alert",
+        description=f"Високий рівень ризику: {risk_score}",
+        severity="critical",
+        source="attack_simulator",
+        target="system",
+        stage="",
+        success=False,
+        defense_modifier=0.0,
+        risk_score=risk_score,
+        threshold=alert_threshold
+    )
+    
+    _append_event(simulation["events"], alert_event)
+    
+    logger.warning("Сповіщення симуляції %s: рівень ризику %s", simulation["id"], risk_score)
+
+def _advance_stage(simulation: Dict[str, Any], stage: Mapping[str, Any],
+                   defense_modifier: float, alert_threshold: float,
+                   attack_duration: float) -> bool:
+    """Виконання одного етапу симуляції (True - симуляцію слід завершити)"""
+    config = simulation["config"]
+    
+    # Виконання етапу
+    stage_result = _execute_stage(stage, defense_modifier, simulation)
+    
+    # Додавання події
+    event = SimulationEvent(
+        timestamp=_elapsed_ns(simulation),
+        event_type=f"stage_{stage['name']}",
+        source="attack_simulator",
+        target=config.get("target", "unknown"),
+        risk_score=0.0,
+        threshold=0.0,
+        **stage_result
+    )
+    
+    _append_event(simulation["events"], event)
+    simulation["metrics"]["total_events"] += 1
+    
+    # Оновлення метрик
+    _update_simulation_metrics(simulation, alert_threshold)
+    
+    # Перевірка умов завершення
+    return _should_stop_simulation(simulation, attack_duration)
+
+def _run_simulation_in_process(simulation: Dict[str, Any], alert_threshold: float,
+                               attack_duration: float) -> Dict[str, Any]:
+    """Виконання симуляції в процесі-воркері без пауз між етапами"""
+    config = simulation["config"]
+    defense_modifier = _calculate_defense_modifier(config.get("defenses", []))
+    
+    for stage in _get_attack_stages(config.get("attack_type", "generic")):
+        if _advance_stage(simulation, stage, defense_modifier, alert_threshold, attack_duration):
+            break
+    return simulation
 
 class AttackSimulator:
     """Симулятор атак для тестування захисту"""
@@ -33,43 +291,70 @@ class AttackSimulator:
         self.attack_duration = self.config.get("simulation.attack_duration", 300)
         self.recovery_time = self.config.get("simulation.recovery_time", 60)
         self.alert_threshold = self.config.get("simulation.alert_threshold", 0.8)
+        self.max_history = max(1, self.config.get("simulation.max_history", 1000))
+        
+        # Симуляції - корутини у спільному event loop: паузи між етапами не займають потоки
+        self._futures: Dict[str, Future] = {}
+        # Пул процесів для пакетних симуляцій створюється при першому використанні
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        # Завершені симуляції в порядку завершення (найстаріші видаляються понад max_history)
+        self._finished_ids = deque()
+        # Лічильники симуляцій за станом для get_system_statistics
+        self._status_counts = Counter()
+        self._completed_risk_sum = 0.0
+        # Захист simulations / running_simulations від одночасної зміни з event loop та потоків API
+        self._lock = threading.Lock()
+    
+    def _new_simulation(self, simulation_config: Dict[str, Any],
+                        callback: Optional[Callable] = None) -> Dict[str, Any]:
+        """Створення запису симуляції"""
+        sim_id = f"sim_{secrets.token_hex(6)}"
+        
+        simulation = {
+            "id": sim_id,
+            "config": simulation_config,
+            "status": "running",
+            "start_time": datetime.now(),
+            # Монотонний годинник для тривалості та часу подій (не залежить від змін системного часу)
+            "start_mono_ns": time.monotonic_ns(),
+            "events": _new_event_columns(),
+            "metrics": {
+                "attack_success": 0,
+                "defense_success": 0,
+                "total_events": 0,
+                "risk_score": 0
+            },
+            "alert_fired": False,
+            "callback": callback
+        }
+        
+        return simulation
+    
+    def _register_simulation(self, simulation: Dict[str, Any]):
+        """Реєстрація симуляції (викликається під self._lock)"""
+        if self.simulations.setdefault(simulation["id"], simulation) is not simulation:
+            raise Exception(f"Конфлікт ідентифікатора симуляції: {simulation['id']}")
     
     def start_simulation(self, simulation_config: Dict[str, Any], 
                         callback: Optional[Callable] = None) -> str:
         """Запуск симуляції атаки"""
         try:
-            sim_id = f"sim_{int(time.time())}_{random.randint(1000, 9999)}"
+            simulation = self._new_simulation(simulation_config, callback)
+            sim_id = simulation["id"]
             
-            # Перевірка лімітів
-            if len(self.running_simulations) >= self.max_concurrent:
-                raise Exception("Досягнуто ліміт одночасних симуляцій")
-            
-            # Створення симуляції
-            simulation = {
-                "id": sim_id,
-                "config": simulation_config,
-                "status": "running",
-                "start_time": datetime.now(),
-                "events": [],
-                "metrics": {
-                    "attack_success": 0,
-                    "defense_success": 0,
-                    "total_events": 0,
-                    "risk_score": 0
-                },
-                "callback": callback
-            }
-            
-            self.simulations[sim_id] = simulation
-            self.running_simulations[sim_id] = simulation
+            # Перевірка лімітів і реєстрація - атомарно
+            with self._lock:
+                if len(self.running_simulations) >= self.max_concurrent:
+                    raise Exception("Досягнуто ліміт одночасних симуляцій")
+                
+                self._register_simulation(simulation)
+                self.running_simulations[sim_id] = simulation
+                self._status_counts["running"] += 1
             
-            # Запуск симуляції в окремому потоці
-            thread = threading.Thread(
-                target=self._run_simulation,
-                args=(sim_id,),
-                daemon=True
-            )
-            thread.start()
+            # Запуск симуляції у спільному event loop
+            future = asyncio.run_coroutine_threadsafe(self._run_simulation(sim_id), get_loop())
+            self._futures[sim_id] = future
+            future.add_done_callback(lambda f: self._on_simulation_done(sim_id, f))
             
             logger.log_simulation(sim_id, "started", f"Attack type: {simulation_config.get('attack_type')}")
             
@@ -79,222 +364,164 @@ class AttackSimulator:
             logger.error(f"Помилка запуску симуляції: {e}")
             raise
     
-    def _run_simulation(self, sim_id: str):
-        """Виконання симуляції в окремому потоці"""
-        try:
-            simulation = self.simulations[sim_id]
-            config = simulation["config"]
-            attack_type = config.get("attack_type", "generic")
+    async def _run_simulation(self, sim_id: str):
+        """Виконання симуляції у спільному event loop"""
+        simulation = self.simulations[sim_id]
+        config = simulation["config"]
+        
+        # Налаштування читаються один раз - незмінні протягом симуляції
+        alert_threshold = self.alert_threshold
+        attack_duration = self.attack_duration
+        
+        # Етапи симуляції та модифікатор захисту
+        stages = _get_attack_stages(config.get("attack_type", "generic"))
+        defense_modifier = _calculate_defense_modifier(config.get("defenses", []))
+        
+        for stage in stages:
+            if simulation["status"] != "running":
+                break
             
-            # Етапи симуляції
-            stages = self._get_attack_stages(attack_type)
+            if _advance_stage(simulation, stage, defense_modifier,
+                              alert_threshold, attack_duration):
+                break
             
-            for stage in stages:
-                if simulation["status"] != "running":
-                    break
+            # Пауза між етапами (зупинка симуляції скасовує очікування)
+            await asyncio.sleep(stage.get("duration", 5))
+        
+        # Завершення симуляції у пулі потоків: callback користувача і запис логу
+        # не блокують спільний event loop (там же виконуються запити до LLM)
+        await asyncio.get_running_loop().run_in_executor(None, self._complete_simulation, sim_id)
+    
+    def start_simulation_batch(self, configs: List[Dict[str, Any]],
+                               callback: Optional[Callable] = None) -> List[Future]:
+        """Запуск пакета незалежних симуляцій у пулі процесів (етапи без пауз)"""
+        try:
+            simulations = [self._new_simulation(simulation_config, callback)
+                           for simulation_config in configs]
+            
+            # Пакет входить у спільний ліміт одночасних симуляцій цілком або не запускається
+            with self._lock:
+                if len(self.running_simulations) + len(simulations) > self.max_concurrent:
+                    raise Exception("Досягнуто ліміт одночасних симуляцій")
                 
-                # Виконання етапу
-                stage_result = self._execute_stage(stage, config, simulation)
+                for simulation in simulations:
+                    self._register_simulation(simulation)
+                    self.running_simulations[simulation["id"]] = simulation
+                    self._status_counts["running"] += 1
+            
+            futures = []
+            for simulation in simulations:
+                sim_id = simulation["id"]
                 
-                # Додавання події
-                event = SimulationEvent(
-                    timestamp=datetime.now(),
-                    event_type=f"stage_{stage['name']}",
-                    description=stage_result["description"],
-                    severity=stage_result["severity"],
-                    source="attack_simulator",
-                    target=config.get("target", "unknown"),
-                    metadata=stage_result
+                # callback не передається у воркер (може бути непіклованим)
+                payload = {key: value for key, value in simulation.items() if key != "callback"}
+                worker_future = self._get_process_pool().submit(
+                    _run_simulation_in_process, payload, self.alert_threshold, self.attack_duration
                 )
+                self._futures[sim_id] = worker_future
                 
-                simulation["events"].append(asdict(event))
-                simulation["metrics"]["total_events"] += 1
-                
-                # Оновлення метрик
-                self._update_simulation_metrics(sim_id)
-                
-                # Перевірка умов завершення
-                if self._should_stop_simulation(simulation):
-                    break
-                
-                # Пауза між етапами
-                time.sleep(stage.get("duration", 5))
+                # Майбутнє завершується лише після перенесення результату в self.simulations
+                done = Future()
+                worker_future.add_done_callback(
+                    lambda f, sim_id=sim_id, done=done: self._on_batch_done(sim_id, f, done)
+                )
+                futures.append(done)
             
-            # Завершення симуляції
-            self._complete_simulation(sim_id)
+            logger.info(f"Запущено пакет симуляцій у пулі процесів: {len(futures)}")
+            return futures
             
         except Exception as e:
-            logger.error(f"Помилка виконання симуляції {sim_id}: {e}")
-            self._fail_simulation(sim_id, str(e))
-    
-    def _get_attack_stages(self, attack_type: str) -> List[Dict[str, Any]]:
-        """Отримання етапів атаки"""
-        base_stages = [
-            {
-                "name": "reconnaissance",
-                "description": "Розвідка цілі",
-                "duration": 10,
-                "success_rate": 0.8
-            },
-            {
-                "name": "weaponization",
-                "description": "Підготовка атаки",
-                "duration": 15,
-                "success_rate": 0.7
-            },
-            {
-                "name": "delivery",
-                "description": "Доставка атаки",
-                "duration": 20,
-                "success_rate": 0.6
-            },
-            {
-                "name": "exploitation",
-                "description": "Експлуатація вразливості",
-                "duration": 25,
-                "success_rate": 0.5
-            },
-            {
-                "name": "installation",
-                "description": "Встановлення зловмисного коду",
-                "duration": 30,
-                "success_rate": 0.4
-            },
-            {
-                "name": "command_control",
-                "description": "Встановлення командного каналу",
-                "duration": 20,
-                "success_rate": 0.3
-            },
-            {
-                "name": "actions_objectives",
-                "description": "Виконання цілей атаки",
-                "duration": 40,
-                "success_rate": 0.2
-            }
-        ]
-        
-        # Адаптація етапів для конкретного типу атаки
-        if attack_type == "phishing":
-            return base_stages[:4]  # Тільки перші 4 етапи
-        elif attack_type == "malware":
-            return base_stages[:6]  # Перші 6 етапів
-        else:
-            return base_stages
-    
-    def _execute_stage(self, stage: Dict[str, Any], config: Dict[str, Any], 
-                       simulation: Dict[str, Any]) -> Dict[str, Any]:
-        """Виконання етапу атаки"""
-        stage_name = stage["name"]
-        success_rate = stage["success_rate"]
-        
-        # Моделювання успішності етапу
-        is_successful = random.random() < success_rate
-        
-        # Вплив захисту на успішність
-        defense_modifier = self._calculate_defense_modifier(config.get("defenses", []))
-        adjusted_success = is_successful and (random.random() > defense_modifier)
-        
-        if adjusted_success:
-            simulation["metrics"]["attack_success"] += 1
-            severity = "high"
-            description = f"Етап '{stage['description']}' успішно виконано"
-        else:
-            simulation["metrics"]["defense_success"] += 1
-            severity = "medium"
-            description = f"Етап '{stage['description']}' заблоковано захистом"
-        
-        return {
-            "stage": stage_name,
-            "description": description,
-            "severity": severity,
-            "success": adjusted_success,
-            "defense_modifier": defense_modifier
-        }
+            logger.error(f"Помилка запуску пакета симуляцій: {e}")
+            raise
     
-    def _calculate_defense_modifier(self, defenses: List[str]) -> float:
-        """Розрахунок модифікатора захисту"""
-        if not defenses:
-            return 0.0
+    def simulate_batch(self, simulation_config: Dict[str, Any], n: int,
+                       seed: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Векторизована симуляція n прогонів однієї конфігурації (метрики без подій та пауз)"""
+        stages = _get_attack_stages(simulation_config.get("attack_type", "generic"))
+        success_rates = np.array([stage["success_rate"] for stage in stages])
+        defense_modifier = _calculate_defense_modifier(simulation_config.get("defenses", []))
         
-        # Базовий модифікатор залежить від кількості заходів захисту
-        base_modifier = min(0.8, len(defenses) * 0.15)
+        # Усі випадкові величини одним викликом: (прогін, етап, [успіх етапу, обхід захисту])
+        rng = np.random.default_rng(seed)
+        draws = rng.random((n, len(stages), 2))
+        attack_hits = (draws[..., 0] < success_rates) & (draws[..., 1] > defense_modifier)
         
-        # Додаткові модифікатори для специфічних заходів
-        special_defenses = {
-            "ids_ips": 0.1,
-            "siem": 0.1,
-            "edr": 0.15,
-            "mfa": 0.2
-        }
+        # Дострокове завершення: 5 успішних етапів атаки або 3 блокування
+        attack_total = attack_hits.cumsum(axis=1)
+        defense_total = (~attack_hits).cumsum(axis=1)
+        stop_mask = (attack_total >= 5) | (defense_total >= 3)
+        last_stage = np.where(stop_mask.any(axis=1), stop_mask.argmax(axis=1), len(stages) - 1)
+        
+        rows = np.arange(n)
+        total_events = last_stage + 1
+        attack_success = attack_total[rows, last_stage]
         
-        additional_modifier = sum(
-            special_defenses.get(defense, 0) 
-            for defense in defenses 
-            if defense in special_defenses
-        )
+        risk_score = np.round(attack_success / total_events, 2)
         
-        return min(0.9, base_modifier + additional_modifier)
+        return {
+            "attack_success": attack_success,
+            "defense_success": total_events - attack_success,
+            "total_events": total_events,
+            "risk_score": risk_score,
+            "risk_level": np.array(_RISK_LABELS)[
+                np.searchsorted(_RISK_THRESHOLDS, risk_score, side="right")
+            ]
+        }
     
-    def _update_simulation_metrics(self, sim_id: str):
-        """Оновлення метрик симуляції"""
-        simulation = self.simulations[sim_id]
-        metrics = simulation["metrics"]
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        """Отримання (або створення) пулу процесів для пакетних симуляцій"""
+        with self._lock:
+            if self._process_pool is None:
+                # spawn: дочірні процеси не успадковують потоки (логер, пул потоків)
+                self._process_pool = ProcessPoolExecutor(
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._process_pool
+    
+    def _on_batch_done(self, sim_id: str, worker_future: Future, done: Future):
+        """Перенесення результату симуляції з процесу-воркера"""
+        self._futures.pop(sim_id, None)
+        if worker_future.cancelled():
+            done.cancel()
+            return
         
-        total_events = metrics["total_events"]
-        if total_events > 0:
-            # Розрахунок ризику на основі успішності атаки
-            attack_ratio = metrics["attack_success"] / total_events
-            metrics["risk_score"] = round(attack_ratio, 2)
-            
-            # Перевірка порогу сповіщень
-            if attack_ratio > self.alert_threshold:
-                self._trigger_alert(sim_id, attack_ratio)
-    
-    def _should_stop_simulation(self, simulation: Dict[str, Any]) -> bool:
-        """Перевірка умов завершення симуляції"""
-        # Завершення за часом
-        elapsed = (datetime.now() - simulation["start_time"]).total_seconds()
-        if elapsed > self.attack_duration:
-            return True
-        
-        # Завершення за успішністю атаки
-        if simulation["metrics"]["attack_success"] >= 5:
-            return True
-        
-        # Завершення за блокуванням
-        if simulation["metrics"]["defense_success"] >= 3:
-            return True
-        
-        return False
-    
-    def _trigger_alert(self, sim_id: str, risk_score: float):
-        """Спрацювання сповіщення"""
-        alert_event = SimulationEvent(
-            timestamp=datetime.now(),
-            event_type="alert",
-            description=f"Високий рівень ризику: {risk_score}",
-            severity="critical",
-            source="attack_simulator",
-            target="system",
-            metadata={"risk_score": risk_score, "threshold": self.alert_threshold}
-        )
+        error = worker_future.exception()
+        if error is not None:
+            logger.error(f"Помилка виконання симуляції {sim_id}: {error}")
+            self._fail_simulation(sim_id, str(error))
+            done.set_exception(error)
+            return
         
-        simulation = self.simulations[sim_id]
-        simulation["events"].append(asdict(alert_event))
+        with self._lock:
+            simulation = self.simulations.get(sim_id)
+        # Результат зупиненої симуляції не перезаписує її кінцевий стан
+        if simulation is not None and simulation["status"] == "running":
+            simulation.update(worker_future.result())
+            self._complete_simulation(sim_id)
+        done.set_result(sim_id)
+    
+    def _on_simulation_done(self, sim_id: str, future: Future):
+        """Обробка завершення задачі симуляції (єдине місце обробки помилок)"""
+        self._futures.pop(sim_id, None)
+        if future.cancelled():
+            return
         
-        logger.warning(f"Сповіщення симуляції {sim_id}: рівень ризику {risk_score}")
+        error = future.exception()
+        if error is not None:
+            logger.error(f"Помилка виконання симуляції {sim_id}: {error}")
+            self._fail_simulation(sim_id, str(error))
     
     def _complete_simulation(self, sim_id: str):
         """Завершення симуляції"""
-        simulation = self.simulations[sim_id]
-        simulation["status"] = "completed"
-        simulation["end_time"] = datetime.now()
-        simulation["duration"] = (simulation["end_time"] - simulation["start_time"]).total_seconds()
+        # Видалення з активних симуляцій (зупинена симуляція не завершується вдруге;
+        # запис симуляції могло видалити clear_simulations - вона ще в running_simulations)
+        with self._lock:
+            simulation = self.running_simulations.get(sim_id)
+            if simulation is None or not self._finish_simulation(sim_id, simulation, "completed"):
+                return
         
-        # Видалення з активних симуляцій
-        if sim_id in self.running_simulations:
-            del self.running_simulations[sim_id]
+        simulation["end_time"] = datetime.now()
+        simulation["duration"] = _elapsed_ns(simulation) / 1e9
         
         # Виклик callback
         if simulation.get("callback"):
@@ -304,33 +531,73 @@ class AttackSimulator:
                 logger.error(f"Помилка callback симуляції {sim_id}: {e}")
         
         logger.log_simulation(sim_id, "completed", 
-                            f"Duration: {simulation['duration']}s, Risk: {simulation['metrics']['risk_score']}")
+                            f"Duration: {simulation['duration']}s, Risk: {simulation['metrics']['risk_score']:.2f}")
     
     def _fail_simulation(self, sim_id: str, error: str):
         """Помилка симуляції"""
-        simulation = self.simulations[sim_id]
-        simulation["status"] = "failed"
+        with self._lock:
+            simulation = self.running_simulations.get(sim_id)
+            if simulation is None or not self._finish_simulation(sim_id, simulation, "failed"):
+                return
+        
         simulation["error"] = error
         simulation["end_time"] = datetime.now()
         
-        if sim_id in self.running_simulations:
-            del self.running_simulations[sim_id]
-        
         logger.log_simulation(sim_id, "failed", error)
     
+    def _finish_simulation(self, sim_id: str, simulation: Dict[str, Any], status: str) -> bool:
+        """Перехід симуляції у кінцевий стан (викликається під self._lock)"""
+        # Симуляція вже завершена (наприклад, зупинена під час останнього етапу)
+        if simulation["status"] in _TERMINAL_STATUSES:
+            return False
+        
+        self.running_simulations.pop(sim_id, None)
+        
+        # Симуляції, видалені clear_simulations, у лічильниках не враховуються
+        if self.simulations.get(sim_id) is simulation:
+            self._status_counts[simulation["status"]] -= 1
+            self._status_counts[status] += 1
+            if status == "completed":
+                self._completed_risk_sum += simulation["metrics"]["risk_score"]
+            self._finished_ids.append(sim_id)
+        
+        simulation["status"] = status
+        
+        # Обмеження історії: довготривалий сервіс не накопичує симуляції без меж
+        while len(self._finished_ids) > self.max_history:
+            self._evict_simulation(self._finished_ids.popleft())
+        
+        return True
+    
+    def _evict_simulation(self, sim_id: str):
+        """Видалення завершеної симуляції з історії (викликається під self._lock)"""
+        simulation = self.simulations.pop(sim_id, None)
+        if simulation is None:
+            return
+        
+        self._status_counts[simulation["status"]] -= 1
+        if simulation["status"] == "completed":
+            self._completed_risk_sum -= simulation["metrics"]["risk_score"]
+    
     def stop_simulation(self, sim_id: str) -> bool:
         """Зупинка симуляції"""
-        if sim_id in self.running_simulations:
-            simulation = self.running_simulations[sim_id]
-            simulation["status"] = "stopped"
-            simulation["end_time"] = datetime.now()
-            
-            del self.running_simulations[sim_id]
-            
-            logger.log_simulation(sim_id, "stopped", "Manually stopped")
-            return True
+        with self._lock:
+            simulation = self.running_simulations.get(sim_id)
+            if simulation is not None:
+                self._finish_simulation(sim_id, simulation, "stopped")
+        
+        if simulation is None:
+            return False
+        
+        simulation["end_time"] = datetime.now()
+        
+        # Скасування корутини симуляції (перериває паузу між етапами)
+        future = self._futures.get(sim_id)
+        if future is not None:
+            future.cancel()
         
-        return False
+        logger.log_simulation(sim_id, "stopped", "Manually stopped")
+        return True
     
     def get_simulation_status(self, sim_id: str) -> Optional[Dict[str, Any]]:
         """Отримання статусу симуляції"""
@@ -338,7 +605,8 @@ class AttackSimulator:
     
     def get_running_simulations(self) -> List[str]:
         """Отримання списку активних симуляцій"""
-        return list(self.running_simulations.keys())
+        with self._lock:
+            return list(self.running_simulations.keys())
     
     def get_simulation_summary(self, sim_id: str) -> Dict[str, Any]:
         """Отримання зведення симуляції"""
@@ -346,6 +614,9 @@ class AttackSimulator:
         if not simulation:
             return {}
         
+        metrics = dict(simulation["metrics"])
+        metrics["risk_score"] = round(metrics["risk_score"], 2)
+        
         return {
             "id": simulation["id"],
             "status": simulation["status"],
@@ -353,39 +624,45 @@ class AttackSimulator:
             "start_time": simulation["start_time"].isoformat() if simulation.get("start_time") else None,
             "end_time": simulation["end_time"].isoformat() if simulation.get("end_time") else None,
             "duration": simulation.get("duration", 0),
-            "metrics": simulation["metrics"],
-            "total_events": len(simulation["events"]),
-            "risk_level": self._calculate_risk_level(simulation["metrics"]["risk_score"])
+            "metrics": metrics,
+            "total_events": len(simulation["events"]["timestamp"]),
+            "risk_level": self._calculate_risk_level(metrics["risk_score"])
         }
     
+    def get_simulation_events(self, sim_id: str) -> List[Dict[str, Any]]:
+        """Отримання подій симуляції з часом у форматі ISO"""
+        simulation = self.simulations.get(sim_id)
+        if not simulation:
+            return []
+        
+        # Збирання рядків з колонок; зміщення (нс) перетворюються у час лише тут
+        start_time = simulation["start_time"]
+        events = simulation["events"]
+        rows = []
+        for values in zip(*(events[name] for name in _EVENT_FIELDS)):
+            event = dict(zip(_EVENT_FIELDS, values))
+            event["timestamp"] = (
+                start_time + timedelta(microseconds=event["timestamp"] // 1000)
+            ).isoformat()
+            event["success"] = bool(event["success"])
+            rows.append(event)
+        return rows
+    
     def _calculate_risk_level(self, risk_score: float) -> str:
         """Розрахунок рівня ризику"""
-        if risk_score >= 0.8:
-            return "critical"
-        elif risk_score >= 0.6:
-            return "high"
-        elif risk_score >= 0.4:
-            return "medium"
-        elif risk_score >= 0.2:
-            return "low"
-        else:
-            return "minimal"
+        return _RISK_LABELS[bisect_right(_RISK_THRESHOLDS, risk_score)]
     
     def get_system_statistics(self) -> Dict[str, Any]:
         """Отримання статистики системи"""
-        total_simulations = len(self.simulations)
-        completed_simulations = len([s for s in self.simulations.values() if s["status"] == "completed"])
-        failed_simulations = len([s for s in self.simulations.values() if s["status"] == "failed"])
-        running_simulations = len(self.running_simulations)
-        
-        if completed_simulations > 0:
-            avg_risk = sum(
-                s["metrics"]["risk_score"] 
-                for s in self.simulations.values() 
-                if s["status"] == "completed"
-            ) / completed_simulations
-        else:
-            avg_risk = 0
+        # Лічильники підтримуються при переходах стану - без проходу по симуляціях
+        with self._lock:
+            total_simulations = len(self.simulations)
+            running_simulations = len(self.running_simulations)
+            completed_simulations = self._status_counts["completed"]
+            failed_simulations = self._status_counts["failed"]
+            risk_sum = self._completed_risk_sum
+        
+        avg_risk = risk_sum / completed_simulations if completed_simulations > 0 else 0
         
         return {
             "total_simulations": total_simulations,
@@ -403,5 +680,9 @@ class AttackSimulator:
     
     def clear_simulations(self):
         """Очищення історії симуляцій"""
-        self.simulations.clear()
+        with self._lock:
+            self.simulations.clear()
+            self._finished_ids.clear()
+            self._status_counts.clear()
+            self._completed_risk_sum = 0.0
         logger.info("Історію симуляцій очищено")
@@ -5,13 +5,24 @@
 
 import sys
 import importlib
+import importlib.util
 from pathlib import Path
 
+# Повна перевірка (--full) виконує код модулів; за замовчуванням модулі лише
+# знаходяться через find_spec без виконання (без ініціалізації логера, клієнтів LLM)
+FULL_CHECK = False
+
 def test_import(module_name, description=""):
     """Тестування імпорту модуля"""
     try:
-        module = importlib.import_module(module_name)
-        print(f"✅ {module_name} - імпортовано успішно")
+        if FULL_CHECK:
+            importlib.import_module(module_name)
+            print(f"✅ {module_name} - імпортовано успішно")
+        elif importlib.util.find_spec(module_name) is not None:
+            print(f"✅ {module_name} - знайдено")
+        else:
+            print(f"❌ {module_name} - модуль не знайдено")
+            return False
         if description:
             print(f"   {description}")
         return True
@@ -28,7 +39,12 @@ def test_utils():
     
     modules = [
         ("utils.config_manager", "Менеджер конфігурації"),
-        ("utils.logger", "Система логування")
+        ("utils.logger", "Система логування"),
+        ("utils.async_runner", "Спільний event loop для LLM викликів"),
+        ("utils.response_cache", "Дисковий кеш відповідей LLM"),
+        ("utils.llm_retry", "Повторні спроби LLM запитів"),
+        ("utils.fast_json", "Швидкий парсинг JSON"),
+        ("utils.rate_limiter", "Обмежувач запитів до LLM провайдерів")
     ]
     
     success_count = 0
@@ -83,16 +99,84 @@ def test_simulation():
     
     return success_count, len(modules)
 
+def _check_statistics(simulator):
+    """Статистика з лічильників збігається з перерахунком по збережених симуляціях"""
+    stats = simulator.get_system_statistics()
+    completed = [sim for sim in simulator.simulations.values() if sim["status"] == "completed"]
+    failed = [sim for sim in simulator.simulations.values() if sim["status"] == "failed"]
+    avg_risk = sum(sim["metrics"]["risk_score"] for sim in completed) / len(completed) if completed else 0
+    
+    assert stats["total_simulations"] == len(simulator.simulations), stats
+    assert stats["completed_simulations"] == len(completed), stats
+    assert stats["failed_simulations"] == len(failed), stats
+    assert stats["running_simulations"] == len(simulator.running_simulations), stats
+    assert stats["average_risk_score"] == round(avg_risk, 2), stats
+
+def _add_running_simulation(simulator, risk_score=0.0):
+    """Реєстрація симуляції як активної (без запуску етапів)"""
+    simulation = simulator._new_simulation({"attack_type": "generic"})
+    simulation["metrics"]["risk_score"] = risk_score
+    with simulator._lock:
+        simulator._register_simulation(simulation)
+        simulator.running_simulations[simulation["id"]] = simulation
+        simulator._status_counts["running"] += 1
+    return simulation["id"]
+
+def test_simulation_bookkeeping():
+    """Перевірка лічильників станів симуляцій (лише з --full)"""
+    print("\n🧮 Перевірка обліку симуляцій:")
+    
+    checks = 0
+    try:
+        from simulation.attack_simulator import AttackSimulator
+        simulator = AttackSimulator()
+        
+        # Зупинка під час останнього етапу: завершення після stop не враховується вдруге
+        sim_id = _add_running_simulation(simulator, 0.9)
+        assert simulator.stop_simulation(sim_id)
+        simulator._complete_simulation(sim_id)
+        simulator._fail_simulation(sim_id, "late error")
+        assert simulator.simulations[sim_id]["status"] == "stopped"
+        assert simulator._status_counts["stopped"] == 1
+        assert simulator._status_counts["running"] == 0
+        assert len(simulator._finished_ids) == 1
+        _check_statistics(simulator)
+        print("✅ Зупинка під час останнього етапу")
+        checks += 1
+        
+        # Витіснення з історії зберігає узгодженість статистики
+        simulator.max_history = 2
+        for risk_score in (0.1, 0.5, 0.9):
+            simulator._complete_simulation(_add_running_simulation(simulator, risk_score))
+        simulator._fail_simulation(_add_running_simulation(simulator), "error")
+        assert len(simulator.simulations) == 2
+        _check_statistics(simulator)
+        
+        # Симуляція, активна під час очищення, після завершення не потрапляє в лічильники
+        sim_id = _add_running_simulation(simulator, 0.7)
+        simulator.clear_simulations()
+        simulator._complete_simulation(sim_id)
+        _check_statistics(simulator)
+        assert simulator.get_system_statistics()["completed_simulations"] == 0
+        print("✅ Витіснення з історії та очищення")
+        checks += 1
+        
+    except AssertionError as e:
+        print(f"❌ Облік симуляцій неузгоджений: {e}")
+    except Exception as e:
+        print(f"⚠️  Перевірка обліку симуляцій - помилка: {e}")
+    
+    return checks, 2
+
 def test_web_app():
     """Тестування веб-додатку"""
     print("\n🌐 Тестування веб-додатку:")
     
     # Перевірка наявності Flask
-    try:
-        import flask
-        print("✅ Flask - імпортовано успішно")
+    if importlib.util.find_spec("flask") is not None:
+        print("✅ Flask - встановлено")
         flask_available = True
-    except ImportError:
+    else:
         print("❌ Flask - не встановлено")
         flask_available = False
     
@@ -122,13 +206,23 @@ def test_external_dependencies():
         ("flask_socketio", "Flask-SocketIO"),
         ("cryptography", "Криптографічні функції"),
         ("numpy", "NumPy для обчислень"),
-        ("pandas", "Pandas для аналізу даних")
+        ("pandas", "Pandas для аналізу даних"),
+        ("httpx", "HTTP клієнт з пулом з'єднань"),
+        ("tenacity", "Повторні спроби запитів"),
+        ("orjson", "Швидкий JSON парсер")
     ]
     
+    # Для сторонніх пакетів достатньо перевірити наявність: find_spec не виконує
+    # код модуля (імпорт pandas/numpy/openai займає секунди)
     success_count = 0
     for module_name, description in dependencies:
-        if test_import(module_name, description):
+        if importlib.util.find_spec(module_name) is not None:
+            print(f"✅ {module_name} - встановлено")
+            if description:
+                print(f"   {description}")
             success_count += 1
+        else:
+            print(f"❌ {module_name} - не встановлено")
     
     return success_count, len(dependencies)
 
@@ -155,6 +249,9 @@ def test_config_files():
 
 def main():
     """Головна функція тестування"""
+    global FULL_CHECK
+    FULL_CHECK = "--full" in sys.argv[1:]
+    
     print("🧪 Тестування імпортів LLM Attack Analysis System")
     print("=" * 60)
     
@@ -181,6 +278,12 @@ def main():
     total_success += success
     total_modules += count
     
+    # Облік станів симуляцій перевіряється лише з виконанням коду модулів
+    if FULL_CHECK:
+        success, count = test_simulation_bookkeeping()
+        total_success += success
+        total_modules += count
+    
     # Тестування веб-додатку
     success, count = test_web_app()
     total_success += success
@@ -196,19 +299,24 @@ def main():
     total_success += success
     total_modules += count
     
-    # Підсумок
-    print("\n" + "=" * 60)
-    print(f"📊 Підсумок тестування:")
-    print(f"   Успішно: {total_success}/{total_modules}")
-    print(f"   Відсоток успіху: {(total_success/total_modules)*100:.1f}%")
+    # Підсумок формується повністю і виводиться одним записом
+    lines = [
+        "\n" + "=" * 60,
+        "📊 Підсумок тестування:",
+        f"   Успішно: {total_success}/{total_modules}",
+        f"   Відсоток успіху: {(total_success/total_modules)*100:.1f}%"
+    ]
     
     if total_success == total_modules:
-        print("\n🎉 Всі модулі успішно імпортовано!")
-        print("Система готова до роботи")
+        lines += ["\n🎉 Всі модулі успішно імпортовано!", "Система готова до роботи"]
     else:
-        print(f"\n⚠️  {total_modules - total_success} модулів мають проблеми")
-        print("Перевірте встановлення залежностей")
-        print("Команда: pip install -r requirements.txt")
+        lines += [
+            f"\n⚠️  {total_modules - total_success} модулів мають проблеми",
+            "Перевірте встановлення залежностей",
+            "Команда: pip install -r requirements.txt"
+        ]
+    
+    sys.stdout.write("\n".join(lines) + "\n")
     
     return total_success == total_modules
 
@@ -0,0 +1,120 @@
+import asyncio
+import atexit
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Optional
+import httpx
+
+# Спільний фоновий event loop для асинхронних LLM викликів.
+# Асинхронні клієнти OpenAI/Anthropic прив'язують пул з'єднань до loop,
+# тому всі виклики виконуються в одному довгоживучому loop.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+# Спільний HTTP клієнт (keep-alive + HTTP/2) для всіх LLM провайдерів
+_http_client: Optional[httpx.AsyncClient] = None
+_http_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Отримання (або запуск) спільного фонового event loop"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=_loop.run_forever,
+                name="llm-async-loop",
+                daemon=True
+            )
+            thread.start()
+    return _loop
+
+
+def run_sync(coro: Awaitable[Any]) -> Any:
+    """Синхронне виконання корутини у спільному event loop"""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop()).result()
+
+
+async def run_in_loop(coro: Awaitable[Any]) -> Any:
+    """Виконання корутини у спільному event loop з будь-якого іншого loop"""
+    loop = get_loop()
+    if asyncio.get_running_loop() is loop:
+        return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+
+# Маркер завершення ітерації при передачі елементів між event loop
+_DONE = object()
+
+
+async def _anext(iterator: AsyncIterator[Any]) -> Any:
+    """Наступний елемент асинхронного ітератора (або маркер завершення)"""
+    try:
+        return await iterator.__anext__()
+    except StopAsyncIteration:
+        return _DONE
+
+
+async def iterate_in_loop(iterator: AsyncIterator[Any]) -> AsyncIterator[Any]:
+    """Ітерація асинхронного генератора, що виконується у спільному event loop"""
+    loop = get_loop()
+    if asyncio.get_running_loop() is loop:
+        async with aclosing(iterator):
+            async for item in iterator:
+                yield item
+        return
+
+    # Якщо споживач припинив ітерацію, генератор закривається одразу
+    # (звільняючи ресурси), а не при збиранні сміття
+    try:
+        while True:
+            item = await run_in_loop(_anext(iterator))
+            if item is _DONE:
+                break
+            yield item
+    finally:
+        await run_in_loop(iterator.aclose())
+
+
+@asynccontextmanager
+async def aclosing(iterator: AsyncIterator[Any]):
+    """Закриття асинхронного генератора при виході з блоку (contextlib.aclosing з Python 3.10)"""
+    try:
+        yield iterator
+    finally:
+        await iterator.aclose()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Отримання спільного HTTP клієнта з пулом з'єднань"""
+    global _http_client
+    with _http_lock:
+        if _http_client is None:
+            limits = httpx.Limits(max_connections=200, max_keepalive_connections=100)
+            try:
+                _http_client = httpx.AsyncClient(http2=True, limits=limits, timeout=60)
+            except ImportError:
+                # Пакет h2 не встановлено - працюємо через HTTP/1.1
+                _http_client = httpx.AsyncClient(limits=limits, timeout=60)
+            atexit.register(_close_http_client_at_exit)
+    return _http_client
+
+
+async def aclose_http_client():
+    """Закриття спільного HTTP клієнта (один раз, при завершенні роботи застосунку)"""
+    global _http_client
+    with _http_lock:
+        client, _http_client = _http_client, None
+    if client is not None:
+        await run_in_loop(client.aclose())
+
+
+def _close_http_client_at_exit():
+    """Закриття спільного HTTP клієнта при завершенні процесу"""
+    if _http_client is None or _loop is None or not _loop.is_running():
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(aclose_http_client(), _loop).result(timeout=5)
+    except Exception:
+        pass
@@ -1,8 +1,21 @@
+import copy
 import os
 import yaml
+from functools import lru_cache
 from typing import Dict, Any, Optional
 from dotenv import load_dotenv
 
+@lru_cache(maxsize=1)
+def _load_dotenv_once():
+    """Одноразове завантаження .env файлу для всього процесу"""
+    load_dotenv()
+
+@lru_cache(maxsize=None)
+def _read_config_file(config_path: str) -> Any:
+    """Читання та парсинг YAML файлу (кешується для всіх екземплярів)"""
+    with open(config_path, 'r', encoding='utf-8') as file:
+        return yaml.safe_load(file)
+
 class ConfigManager:
     """Менеджер конфігурації системи"""
     
@@ -14,13 +27,13 @@ class ConfigManager:
     
     def _load_environment(self):
         """Завантаження змінних середовища"""
-        load_dotenv()
+        _load_dotenv_once()
     
     def _load_config(self):
         """Завантаження конфігурації з файлу"""
         try:
-            with open(self.config_path, 'r', encoding='utf-8') as file:
-                self.config = yaml.safe_load(file)
+            # Копія, бо заміна змінних середовища змінює словник на місці
+            self.config = copy.deepcopy(_read_config_file(self.config_path))
             
             # Заміна змінних середовища
             self._replace_environment_variables(self.config)
@@ -76,6 +89,7 @@ class ConfigManager:
     
     def reload(self):
         """Перезавантаження конфігурації"""
+        _read_config_file.cache_clear()
         self._load_config()
     
     def is_debug_mode(self) -> bool:
@@ -0,0 +1,37 @@
+import json
+from typing import Any, Callable, Optional
+
+# orjson (Rust) значно швидший за стандартний json; якщо пакет
+# не встановлено - використовується стандартна бібліотека.
+# orjson.JSONDecodeError успадковує json.JSONDecodeError.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSONDecodeError = json.JSONDecodeError
+
+
+def loads(data: Any) -> Any:
+    """Парсинг JSON рядка або байтів"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, default: Optional[Callable[[Any], Any]] = None,
+          sort_keys: bool = False, indent: bool = False,
+          native_datetime: bool = True) -> str:
+    """Серіалізація в JSON рядок (UTF-8, datetime - у форматі ISO 8601)"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        # datetime передається у default (наприклад, для формату HTTP-date Flask)
+        if not native_datetime:
+            option |= orjson.OPT_PASSTHROUGH_DATETIME
+        return orjson.dumps(obj, default=default, option=option).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, default=default,
+                      sort_keys=sort_keys, indent=2 if indent else None)
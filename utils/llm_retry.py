@@ -0,0 +1,50 @@
+import openai
+import anthropic
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+# Тимчасові помилки провайдерів, після яких має сенс повторити запит
+# (429, 5xx, обрив з'єднання/таймаут). Помилки автентифікації та 4xx
+# не повторюються.
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+    anthropic.RateLimitError,
+    anthropic.APIConnectionError,
+    anthropic.InternalServerError,
+)
+
+# Відповіді 429 - сигнал для зменшення паралельності (utils.rate_limiter)
+RATE_LIMIT_ERRORS = (
+    openai.RateLimitError,
+    anthropic.RateLimitError,
+)
+
+_backoff = wait_random_exponential(multiplier=1, max=60)
+
+
+def _wait_retry_after(retry_state) -> float:
+    """Затримка перед повтором: Retry-After з відповіді або експоненційна з jitter"""
+    error = retry_state.outcome.exception()
+    response = getattr(error, "response", None)
+    if response is not None:
+        try:
+            return min(float(response.headers.get("retry-after")), 60.0)
+        except (TypeError, ValueError):
+            pass
+    return _backoff(retry_state)
+
+
+def llm_retry(attempts: int = 5):
+    """Декоратор повторних спроб для асинхронних викликів LLM API"""
+    return retry(
+        stop=stop_after_attempt(attempts),
+        wait=_wait_retry_after,
+        retry=retry_if_exception_type(RETRYABLE_ERRORS),
+        reraise=True
+    )
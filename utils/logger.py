@@ -1,7 +1,9 @@
+import atexit
 import logging
 import os
+import queue
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from typing import Optional
 from utils.config_manager import ConfigManager
 
@@ -11,6 +13,7 @@ class Logger:
     def __init__(self, name: str = "llm_attack_system"):
         self.name = name
         self.config = ConfigManager()
+        self._listener = None
         self.logger = self._setup_logger()
     
     def _setup_logger(self) -> logging.Logger:
@@ -32,7 +35,7 @@ class Logger:
         console_handler = logging.StreamHandler()
         console_handler.setLevel(logging.INFO)
         console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+        handlers = [console_handler]
         
         # Файловий хендлер
         log_file = self.config.get("logging.file_path", "logs/system.log")
@@ -46,7 +49,15 @@ class Logger:
             )
             file_handler.setLevel(logging.DEBUG)
             file_handler.setFormatter(formatter)
-            logger.addHandler(file_handler)
+            handlers.append(file_handler)
+        
+        # Запис у файл/консоль виконується у фоновому потоці:
+        # виклики логування лише кладуть запис у чергу
+        log_queue = queue.SimpleQueue()
+        logger.addHandler(QueueHandler(log_queue))
+        self._listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        self._listener.start()
+        atexit.register(self._listener.stop)
         
         return logger
     
@@ -74,50 +85,47 @@ class Logger:
         else:
             return int(size_str)
     
-    def debug(self, message: str):
+    def debug(self, message: str, *args):
         """Логування на рівні DEBUG"""
-        self.logger.debug(message)
+        self.logger.debug(message, *args)
     
-    def info(self, message: str):
+    def info(self, message: str, *args):
         """Логування на рівні INFO"""
-        self.logger.info(message)
+        self.logger.info(message, *args)
     
-    def warning(self, message: str):
+    def warning(self, message: str, *args):
         """Логування на рівні WARNING"""
-        self.logger.warning(message)
+        self.logger.warning(message, *args)
     
-    def error(self, message: str):
+    def error(self, message: str, *args):
         """Логування на рівні ERROR"""
-        self.logger.error(message)
+        self.logger.error(message, *args)
     
-    def critical(self, message: str):
+    def critical(self, message: str, *args):
         """Логування на рівні CRITICAL"""
-        self.logger.critical(message)
+        self.logger.critical(message, *args)
     
+    # Доменні записи передають аргументи окремо: рядок форматується лише
+    # якщо запис пройшов фільтр рівня
     def log_attack(self, attack_type: str, target: str, details: str):
         """Логування атаки"""
-        message = f"ATTACK: {attack_type} -> {target} | {details}"
-        self.warning(message)
+        self.warning("ATTACK: %s -> %s | %s", attack_type, target, details)
     
     def log_defense(self, defense_type: str, target: str, details: str):
         """Логування захисту"""
-        message = f"DEFENSE: {defense_type} -> {target} | {details}"
-        self.info(message)
+        self.info("DEFENSE: %s -> %s | %s", defense_type, target, details)
     
     def log_llm_interaction(self, provider: str, model: str, action: str):
         """Логування взаємодії з LLM"""
-        message = f"LLM: {provider}/{model} | {action}"
-        self.info(message)
+        self.info("LLM: %s/%s | %s", provider, model, action)
     
     def log_network_scan(self, target: str, ports: list, results: dict):
         """Логування сканування мережі"""
-        message = f"NETWORK_SCAN: {target} | Ports: {ports} | Results: {results}"
-        self.info(message)
+        self.info("NETWORK_SCAN: %s | Ports: %s | Results: %s", target, ports, results)
     
     def log_simulation(self, sim_id: str, action: str, details: str):
         """Логування симуляції"""
-        message = f"SIMULATION[{sim_id}]: {action} | {details}"
-        self.info(message)
+        self.info("SIMULATION[%s]: %s | %s", sim_id, action, details)
 
 # Глобальний екземпляр логера
 logger = Logger()
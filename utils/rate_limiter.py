@@ -0,0 +1,112 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional
+from utils.llm_retry import RATE_LIMIT_ERRORS
+
+# Стартові ліміти провайдерів - основне джерело значень. config.yaml не задає їх;
+# ключі llm_providers.<provider>.max_concurrency / rpm / tpm лише перевизначають
+# профіль для конкретного облікового запису
+PROVIDER_PROFILES: Dict[str, Dict[str, int]] = {
+    "openai": {"max_concurrency": 10, "rpm": 500, "tpm": 30000},
+    "anthropic": {"max_concurrency": 5, "rpm": 50, "tpm": 40000},
+}
+
+_WINDOW = 60.0
+
+
+def estimate_tokens(prompt: str, max_tokens: int) -> int:
+    """Груба оцінка токенів запиту (~4 символи на токен) для TPM ліміту"""
+    return len(prompt) // 4 + max_tokens
+
+
+class ProviderLimiter:
+    """Обмежувач паралельності та RPM/TPM для провайдера LLM з AIMD підлаштуванням"""
+
+    def __init__(self, max_concurrent: int, rpm: Optional[int] = None,
+                 tpm: Optional[int] = None):
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.limit = self.max_concurrent
+        self.rpm = rpm
+        self.tpm = tpm
+        self._in_flight = 0
+        self._successes = 0
+        self._window = deque()  # (час запиту, оцінка токенів)
+        self._window_tokens = 0
+        self._cond: Optional[asyncio.Condition] = None
+
+    @classmethod
+    def for_provider(cls, provider: str, config: Dict[str, Any]) -> "ProviderLimiter":
+        """Створення обмежувача з профілю провайдера та конфігурації"""
+        profile = dict(PROVIDER_PROFILES.get(provider, {"max_concurrency": 10}))
+        for key in ("max_concurrency", "rpm", "tpm"):
+            if config.get(key) is not None:
+                profile[key] = config[key]
+        return cls(profile["max_concurrency"], profile.get("rpm"), profile.get("tpm"))
+
+    def _condition(self) -> asyncio.Condition:
+        # Створюється в спільному event loop при першому використанні
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        return self._cond
+
+    def _expire(self, now: float):
+        """Видалення запитів, що вийшли за межі ковзного вікна"""
+        while self._window and now - self._window[0][0] >= _WINDOW:
+            _, tokens = self._window.popleft()
+            self._window_tokens -= tokens
+
+    def _window_wait(self, est_tokens: int) -> float:
+        """Час очікування до звільнення місця в RPM/TPM вікні"""
+        now = time.monotonic()
+        self._expire(now)
+        if not self._window:
+            return 0.0
+        rpm_full = self.rpm is not None and len(self._window) >= self.rpm
+        tpm_full = self.tpm is not None and self._window_tokens + est_tokens > self.tpm
+        if rpm_full or tpm_full:
+            return max(0.0, _WINDOW - (now - self._window[0][0]))
+        return 0.0
+
+    @asynccontextmanager
+    async def slot(self, est_tokens: int = 0):
+        """Очікування вільного слоту перед викликом API"""
+        cond = self._condition()
+        async with cond:
+            while True:
+                await cond.wait_for(lambda: self._in_flight < self.limit)
+                delay = self._window_wait(est_tokens)
+                if delay <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(cond.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+            self._in_flight += 1
+            self._window.append((time.monotonic(), est_tokens))
+            self._window_tokens += est_tokens
+
+        try:
+            yield
+        except RATE_LIMIT_ERRORS:
+            self._on_rate_limited()
+            raise
+        else:
+            self._on_success()
+        finally:
+            async with cond:
+                self._in_flight -= 1
+                cond.notify_all()
+
+    def _on_rate_limited(self):
+        """Мультиплікативне зменшення ліміту після 429"""
+        self.limit = max(1, int(self.limit * 0.5))
+        self._successes = 0
+
+    def _on_success(self):
+        """Адитивне збільшення ліміту після вікна успішних запитів"""
+        self._successes += 1
+        if self._successes >= self.limit and self.limit < self.max_concurrent:
+            self.limit += 1
+            self._successes = 0
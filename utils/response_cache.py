@@ -0,0 +1,59 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Any, Optional
+from utils import fast_json
+
+class ResponseCache:
+    """Дисковий кеш відповідей LLM на основі SQLite"""
+
+    def __init__(self, cache_file: str):
+        self.cache_file = cache_file
+        cache_dir = os.path.dirname(cache_file)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(cache_file, check_same_thread=False)
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT)"
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(request: Dict[str, Any]) -> str:
+        """Формування ключа кешу з канонічного JSON запиту"""
+        canonical = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Отримання відповіді з кешу"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        return fast_json.loads(row[0]) if row else None
+
+    def put(self, key: str, response: Any):
+        """Збереження відповіді в кеш"""
+        payload = fast_json.dumps(response)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response) VALUES (?, ?)",
+                (key, payload)
+            )
+            self._conn.commit()
+
+    def clear(self):
+        """Очищення кешу"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self):
+        """Закриття з'єднання з базою кешу"""
+        with self._lock:
+            self._conn.close()
@@ -1,4 +1,5 @@
 from flask import Flask, render_template, request, jsonify, session, redirect, url_for
+from flask.json.provider import DefaultJSONProvider
 from flask_socketio import SocketIO, emit
 import json
 import os
@@ -11,15 +12,45 @@ import time
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 
+from utils import fast_json
 from utils.config_manager import ConfigManager
 from utils.logger import logger
 from attack.llm_attack_generator import LLMAttackGenerator
 from defense.defense_analyzer import DefenseAnalyzer
 from simulation.attack_simulator import AttackSimulator
 
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON провайдер Flask на основі orjson для відповідей API"""
+    
+    def dumps(self, obj, **kwargs):
+        indent = kwargs.pop("indent", None)
+        separators = kwargs.pop("separators", None)
+        
+        # orjson підтримує лише компактний вивід і відступ у 2 пробіли; інші
+        # параметри обробляє стандартний провайдер Flask
+        if kwargs or indent not in (None, 2) or separators not in (None, (",", ":")):
+            return super().dumps(obj, indent=indent, separators=separators, **kwargs)
+        
+        # Формат як у стандартного провайдера: datetime - HTTP-date, ключі відсортовані
+        return fast_json.dumps(obj, default=self.default, sort_keys=self.sort_keys,
+                               indent=indent is not None, native_datetime=False)
+
+class SocketIOJSON:
+    """JSON модуль для пакетів Socket.IO на основі orjson (оновлення симуляцій)"""
+    
+    @staticmethod
+    def dumps(obj, **kwargs):
+        # separators та інші параметри stdlib json не потрібні: orjson пише компактний JSON
+        return fast_json.dumps(obj)
+    
+    @staticmethod
+    def loads(data, **kwargs):
+        return fast_json.loads(data)
+
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
-socketio = SocketIO(app, cors_allowed_origins="*")
+socketio = SocketIO(app, cors_allowed_origins="*", json=SocketIOJSON)
 
 # Ініціалізація компонентів
 config = ConfigManager()
@@ -243,6 +274,10 @@ def api_simulation_status(simulation_id):
         if not status:
             return jsonify({'error': 'Симуляцію не знайдено'}), 404
         
+        # Callback не серіалізується, події зберігаються у колонках - віддаємо рядками
+        status = {key: value for key, value in status.items() if key != 'callback'}
+        status['events'] = attack_simulator.get_simulation_events(simulation_id)
+        
         return jsonify(status)
         
     except Exception as e:
@@ -3,6 +3,7 @@
 Скрипт для запуску веб-додатку LLM Attack Analysis System
 """
 
+import importlib.util
 import os
 import sys
 import argparse
@@ -15,23 +16,22 @@ sys.path.insert(0, str(parent_dir))
 
 def check_dependencies():
     """Перевірка залежностей"""
-    required_packages = [
-        'flask',
-        'flask-socketio',
-        'openai',
-        'anthropic',
-        'pyyaml',
-        'python-dotenv'
+    # Пакет pip -> модуль для імпорту
+    required_packages = {
+        'flask': 'flask',
+        'flask-socketio': 'flask_socketio',
+        'openai': 'openai',
+        'anthropic': 'anthropic',
+        'pyyaml': 'yaml',
+        'python-dotenv': 'dotenv'
+    }
+    
+    # find_spec лише знаходить модуль, не виконуючи його код
+    missing_packages = [
+        package for package, module in required_packages.items()
+        if importlib.util.find_spec(module) is None
     ]
     
-    missing_packages = []
-    
-    for package in required_packages:
-        try:
-            __import__(package.replace('-', '_'))
-        except ImportError:
-            missing_packages.append(package)
-    
     if missing_packages:
         print("❌ Відсутні залежності:")
         for package in missing_packages: